@@ -7,10 +7,10 @@ from pathlib import Path
 from typing import Dict, Any
 from datetime import datetime
 from src.integrations.git_integration import GitIntegration
-from src.integrations.slack_integration import slack_integration
+from src.integrations.slack_integration import slack_integration, close_shared_session
 from src.integrations.mcp_unified import MCPToolsProvider
-from src.utils.ai_client import ai_client
-from src.knowledge_base.rag_system import rag_system
+from src.utils.ai_client import get_ai_client
+from src.knowledge_base.rag_system import get_rag_system
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.prebuilt import create_react_agent
 
@@ -124,6 +124,14 @@ class WorkflowAgent:
                 # Force clear the reference immediately
                 self.mcp_tools_provider = None
                 self.unified_agent = None
+            
+            # Close the shared HTTP sessions so their connectors don't outlive the event loop
+            try:
+                from src.integrations.confluence_integration import confluence_integration
+                await close_shared_session()
+                await confluence_integration.close()
+            except Exception as cleanup_error:
+                print(f"⚠️ HTTP session cleanup error (ignored): {cleanup_error}")
 
             print("✅ Workflow completed successfully!")
 
@@ -140,17 +148,17 @@ class WorkflowAgent:
         await self.mcp_tools_provider._ensure_sessions_initialized()
         mcp_tools = self.mcp_tools_provider.get_all_tools()
         
-        # 3. Get the single AI model from ai_client
-        self.chat_model = ai_client.get_chat_model(temperature=0.1, max_tokens=4096)
+        # 3. Get the single AI model from the shared AI client
+        self.chat_model = get_ai_client().get_chat_model(temperature=0.1, max_tokens=4096)
         
         # 4. Create unified agent with AI model + MCP tools
-        # Note: RAG integration happens in individual methods via rag_system.query_knowledge()
+        # Note: RAG integration happens in individual methods via get_rag_system().query_knowledge()
         self.unified_agent = create_react_agent(self.chat_model, mcp_tools)
         
         tool_summary = self.mcp_tools_provider.get_tool_summary()
         print(f"✅ Unified agent initialized:")
         print(f"   🧠 AI Model: {self.chat_model.__class__.__name__}")
-        print(f"   📚 RAG System: Available via rag_system.query_knowledge()")
+        print(f"   📚 RAG System: Available via get_rag_system().query_knowledge()")
         print(f"   🛠️ MCP Tools: {tool_summary['total_tools']} tools")
         print(f"      📊 Atlassian: {tool_summary['atlassian_tools']} tools")
         print(f"      ⚡ GitHub: {tool_summary['github_tools']} tools")
@@ -163,7 +171,7 @@ class WorkflowAgent:
             content = f.read()
 
         # Query RAG system for relevant context
-        rag_context = rag_system.query_knowledge("meeting transcript analysis project requirements", top_k=3)
+        rag_context = get_rag_system().query_knowledge("meeting transcript analysis project requirements", top_k=3)
         rag_knowledge = "\n".join([f"- {result['content']}" for result in rag_context])
 
         # Use the unified AI model (same one that has MCP tools available)
@@ -238,7 +246,7 @@ Return only valid JSON without any markdown formatting.
         print("📋 Step 2: Generating requirements document with RAG context...")
 
         # Query RAG for requirements patterns and templates
-        rag_context = rag_system.query_knowledge("requirements document business functional non-functional", top_k=3)
+        rag_context = get_rag_system().query_knowledge("requirements document business functional non-functional", top_k=3)
         rag_knowledge = "\n".join([f"- {result['content']}" for result in rag_context])
 
         system_prompt = f"""
@@ -343,7 +351,7 @@ Convert Linux system code to Windows API equivalents.
         # Query RAG system for relevant conversion knowledge
         transcript = self.workflow_context.get("transcript", {})
         project_summary = transcript.get("summary", "")
-        rag_results = rag_system.query_knowledge(f"Linux to Windows conversion {project_summary}", top_k=5)
+        rag_results = get_rag_system().query_knowledge(f"Linux to Windows conversion {project_summary}", top_k=5)
 
         # Build context from RAG results
         conversion_knowledge = "\n".join([
@@ -569,7 +577,7 @@ Convert Linux system calls to equivalent Windows API calls while maintaining fun
         try:
             # Query knowledge base for implementation guidance
             knowledge_query = f"cross-platform implementation {transcript_content.get('project_name', '')}"
-            knowledge_results = rag_system.query_knowledge(knowledge_query, top_k=3)
+            knowledge_results = get_rag_system().query_knowledge(knowledge_query, top_k=3)
             if knowledge_results:
                 knowledge_context = f"\n\nKnowledge Base Context:\n" + "\n".join([f"- {result['content']}" for result in knowledge_results]) + "\n"
         except Exception as e:
@@ -699,7 +707,7 @@ Please generate minimal Windows compatibility files based on the repository lang
         knowledge_context = ""
         try:
             knowledge_query = f"unit testing cross-platform {transcript_content.get('project_name', '')}"
-            knowledge_results = rag_system.query_knowledge(knowledge_query, top_k=3)
+            knowledge_results = get_rag_system().query_knowledge(knowledge_query, top_k=3)
             if knowledge_results:
                 knowledge_context = f"\n\nKnowledge Base Context:\n" + "\n".join([f"- {result['content']}" for result in knowledge_results]) + "\n"
         except Exception as e:
@@ -837,7 +845,7 @@ Please generate minimal unit tests that validate the cross-platform implementati
         knowledge_context = ""
         try:
             knowledge_query = f"documentation standards cross-platform {transcript_content.get('project_name', '')}"
-            knowledge_results = rag_system.query_knowledge(knowledge_query, top_k=3)
+            knowledge_results = get_rag_system().query_knowledge(knowledge_query, top_k=3)
             if knowledge_results:
                 knowledge_context = f"\n\nKnowledge Base Context:\n" + "\n".join([f"- {result['content']}" for result in knowledge_results]) + "\n"
         except Exception as e:
@@ -1,39 +1,49 @@
+import asyncio
 import logging
 import os
-# Import WebClient from Python SDK (github.com/slackapi/python-slack-sdk)
-from slack_sdk import WebClient
+from aiolimiter import AsyncLimiter
+# Import AsyncWebClient from Python SDK (github.com/slackapi/python-slack-sdk)
+from slack_sdk.web.async_client import AsyncWebClient
 from slack_sdk.errors import SlackApiError
 
-# WebClient instantiates a client that can call API methods
-# When using Bolt, you can use either `app.client` or the `client` passed to listeners.
-client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN", ""))
+# AsyncWebClient instantiates a client that can call API methods without blocking the event loop
+# The module-level instance is reused across calls so its connection pool is shared.
+client = AsyncWebClient(token=os.environ.get("SLACK_BOT_TOKEN", ""))
 logger = logging.getLogger(__name__)
 
 # ID of channel you want to post message to
 channel_id = "C09A4RKAER4"  # Replace with your channel ID
 
-def post_slack_message(confluencePageURL: str, githubPRURL: str, jiraTicketURL: str):
+# Fixed message body - only the three URLs change between posts
+_TEMPLATE_TEXT = (
+    "Minion has finished working on new feature. Kindly review and approve the following:\n\n"
+    "Confluence Page: {c}\nGitHub PR: {g}\nJira Ticket: {j}"
+)
+
+# Shared token bucket keeping chat.postMessage under Slack's ~1 request/second limit
+_slack_limiter = AsyncLimiter(max_rate=1, time_period=1.0)
+
+async def post_slack_message(confluencePageURL: str, githubPRURL: str, jiraTicketURL: str):
     """
     Post an initial message to the Slack channel to indicate that the bot is ready.
     """
     
-    # Use the WebClient to post a message
+    text = _TEMPLATE_TEXT.format(c=confluencePageURL, g=githubPRURL, j=jiraTicketURL)
+    blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": text}}]
+    
+    # Use the AsyncWebClient to post a message, paced by the shared rate limiter
     try:
-        result = client.chat_postMessage(
-            channel=channel_id,
-            blocks=[
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"Minion has finished working on new feature. Kindly review and approve the following:\n\nConfluence Page: {confluencePageURL}\nGitHub PR: {githubPRURL}\nJira Ticket: {jiraTicketURL}"
-                    }
-                }
-                # {
-                #     "type": "divider"
-                # }
-            ]
-        )
+        try:
+            async with _slack_limiter:
+                result = await client.chat_postMessage(channel=channel_id, blocks=blocks)
+        except SlackApiError as e:
+            if e.response.status_code != 429:
+                raise
+            # Rate limited anyway - wait exactly as long as Slack asks, then retry once
+            retry_after = float(e.response.headers.get("Retry-After", 1))
+            await asyncio.sleep(retry_after)
+            async with _slack_limiter:
+                result = await client.chat_postMessage(channel=channel_id, blocks=blocks)
         # Print result, which includes information about the message (like TS)
         print(result)
 
@@ -50,7 +60,7 @@ def post_slack_message(confluencePageURL: str, githubPRURL: str, jiraTicketURL:
 #     githubPRURL = "https://github.com/example/repo/pull/1"
 #     jiraTicketURL = "https://jira.example.com/browse/TICKET-123"
 
-#     post_slack_message(confluencePageURL, githubPRURL, jiraTicketURL)
+#     asyncio.run(post_slack_message(confluencePageURL, githubPRURL, jiraTicketURL))
 
 # if __name__ == "__main__":
 #     main()
\ No newline at end of file
@@ -1,16 +1,94 @@
 # Confluence integration for documentation storage
 
 import os
+import re
 import asyncio
 import json
 import base64
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Iterable, Iterator, AsyncIterator
 import aiohttp
+import orjson
 import ssl
-from dotenv import load_dotenv
+from src.utils.env import load_env_once
 
-load_dotenv()
+load_env_once()
+
+# Shared SSL context for corporate networks - built once instead of per request
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.check_hostname = False
+_SSL_CTX.verify_mode = ssl.CERT_NONE
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize request payloads with orjson - page bodies can be tens of KB of HTML"""
+    return orjson.dumps(obj).decode()
+
+# Static storage-format templates; only the timestamp and body are filled in per page
+_FOLDER_TEMPLATE = """
+<ac:structured-macro ac:name="info" ac:schema-version="1">
+<ac:parameter ac:name="title">AI-Generated Project Folder</ac:parameter>
+<ac:rich-text-body>
+<p>This folder was automatically created by the AI Employee Workflow System on {timestamp}</p>
+<p>This page contains related documentation for the project: {folder_name}</p>
+</ac:rich-text-body>
+</ac:structured-macro>
+
+<h1>Project Overview: {folder_name}</h1>
+<p>This folder contains all documentation related to this AI-generated project implementation.</p>
+
+<h2>Contents</h2>
+<p>Sub-pages will be automatically organized under this folder:</p>
+<ul>
+<li>Requirements Documentation</li>
+<li>Technical Design Specification</li>
+<li>Implementation Documentation</li>
+</ul>
+
+<ac:structured-macro ac:name="children" ac:schema-version="2">
+<ac:parameter ac:name="all">true</ac:parameter>
+</ac:structured-macro>
+"""
+
+_PAGE_TEMPLATE = """
+<ac:structured-macro ac:name="info" ac:schema-version="1">
+<ac:parameter ac:name="title">AI-Generated Documentation</ac:parameter>
+<ac:rich-text-body>
+<p>This page was automatically generated by the AI Employee Workflow System on {timestamp}</p>
+</ac:rich-text-body>
+</ac:structured-macro>
+
+{content}
+"""
+
+# One markdown line: surrounding whitespace is excluded from "stripped", "kind" marks list items and raw HTML
+_LINE_RE = re.compile(
+    r'^[^\S\n]*(?P<stripped>(?P<kind>(?:- |\d+\. )(?=[^\S\n]*\S)|<h|<ac:structured-macro)?.*?)[^\S\n]*$',
+    re.MULTILINE
+)
+
+# Placeholder swapped for the streamed page body when encoding request payloads
+_BODY_SENTINEL = "\x00confluence-body\x00"
+_BODY_SENTINEL_JSON = orjson.dumps(_BODY_SENTINEL)[1:-1]
+
+# Converted page bodies are JSON-encoded and sent in pieces of this many characters
+_BODY_CHUNK_CHARS = 64 * 1024
+
+
+def _iter_chunks(text: str, size: int = _BODY_CHUNK_CHARS) -> Iterator[str]:
+    """Split text into fixed-size pieces for streaming"""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+async def _stream_json_body(payload: Dict[str, Any], chunks: Iterable[str]) -> AsyncIterator[bytes]:
+    """Encode payload as JSON, streaming chunks in place of the body sentinel value"""
+    prefix, suffix = orjson.dumps(payload).split(_BODY_SENTINEL_JSON, 1)
+    yield prefix
+    for chunk in chunks:
+        # Dump as a JSON string and drop the surrounding quotes to get the escaped fragment
+        yield orjson.dumps(chunk)[1:-1]
+    yield suffix
 
 class ConfluenceIntegration:
     """
@@ -43,6 +121,20 @@ class ConfluenceIntegration:
         }
         
         self.api_base = f"{self.base_url}/wiki/rest/api"
+        self._session = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use so the connection pool is reused"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(ssl=_SSL_CTX, limit=32)
+            self._session = aiohttp.ClientSession(connector=connector, json_serialize=_json_dumps)
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def create_project_folder(self, folder_name: str) -> Dict[str, Any]:
         """Create a parent page that acts as a folder for organizing related pages"""
@@ -62,38 +154,32 @@ class ConfluenceIntegration:
         }
         
         try:
-            # Create SSL context for corporate networks
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.post(
-                    f"{self.api_base}/content",
-                    json=folder_data,
-                    headers=self.headers
-                ) as response:
+            session = await self._get_session()
+            async with session.post(
+                f"{self.api_base}/content",
+                json=folder_data,
+                headers=self.headers
+            ) as response:
+                
+                if response.status == 200:
+                    result = orjson.loads(await response.read())
+                    page_url = f"{self.base_url}/wiki{result['_links']['webui']}"
+                    
+                    return {
+                        "success": True,
+                        "folder_id": result["id"],
+                        "folder_url": page_url,
+                        "folder_title": folder_name,
+                        "message": f"Successfully created Confluence folder: {folder_name}"
+                    }
+                else:
+                    error_text = await response.text()
+                    return {
+                        "success": False,
+                        "error": f"HTTP {response.status}",
+                        "message": f"Failed to create Confluence folder: {error_text}"
+                    }
                     
-                    if response.status == 200:
-                        result = await response.json()
-                        page_url = f"{self.base_url}/wiki{result['_links']['webui']}"
-                        
-                        return {
-                            "success": True,
-                            "folder_id": result["id"],
-                            "folder_url": page_url,
-                            "folder_title": folder_name,
-                            "message": f"Successfully created Confluence folder: {folder_name}"
-                        }
-                    else:
-                        error_text = await response.text()
-                        return {
-                            "success": False,
-                            "error": f"HTTP {response.status}",
-                            "message": f"Failed to create Confluence folder: {error_text}"
-                        }
-                        
         except Exception as e:
             return {
                 "success": False,
@@ -118,7 +204,7 @@ class ConfluenceIntegration:
             },
             "body": {
                 "storage": {
-                    "value": self._format_content_for_confluence(content),
+                    "value": _BODY_SENTINEL,
                     "representation": "storage"
                 }
             }
@@ -129,38 +215,35 @@ class ConfluenceIntegration:
             page_data["ancestors"] = [{"id": parent_page_id}]
         
         try:
-            # Create SSL context for corporate networks
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.post(
-                    f"{self.api_base}/content",
-                    json=page_data,
-                    headers=self.headers
-                ) as response:
+            session = await self._get_session()
+            # Stream the page body with chunked transfer instead of materializing the whole document
+            body = _stream_json_body(page_data, self._iter_content_for_confluence(content))
+            async with session.post(
+                f"{self.api_base}/content",
+                data=body,
+                headers=self.headers
+            ) as response:
+                
+                if response.status == 200:
+                    # The response echoes the stored page body, so parse raw bytes with orjson
+                    result = orjson.loads(await response.read())
+                    page_url = f"{self.base_url}/wiki{result['_links']['webui']}"
+                    
+                    return {
+                        "success": True,
+                        "page_id": result["id"],
+                        "page_url": page_url,
+                        "page_title": page_title,
+                        "message": f"Successfully created Confluence page: {page_title}"
+                    }
+                else:
+                    error_text = await response.text()
+                    return {
+                        "success": False,
+                        "error": f"HTTP {response.status}",
+                        "message": f"Failed to create Confluence page: {error_text}"
+                    }
                     
-                    if response.status == 200:
-                        result = await response.json()
-                        page_url = f"{self.base_url}/wiki{result['_links']['webui']}"
-                        
-                        return {
-                            "success": True,
-                            "page_id": result["id"],
-                            "page_url": page_url,
-                            "page_title": page_title,
-                            "message": f"Successfully created Confluence page: {page_title}"
-                        }
-                    else:
-                        error_text = await response.text()
-                        return {
-                            "success": False,
-                            "error": f"HTTP {response.status}",
-                            "message": f"Failed to create Confluence page: {error_text}"
-                        }
-                        
         except Exception as e:
             return {
                 "success": False,
@@ -168,57 +251,48 @@ class ConfluenceIntegration:
                 "message": f"Failed to create Confluence page: {str(e)}"
             }
     
+    async def create_project_pages(self,
+                                 parent_page_id: str,
+                                 pages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Create several child pages under an existing parent page concurrently"""
+        
+        return await asyncio.gather(*(
+            self.create_project_page(page_title, content, parent_page_id=parent_page_id)
+            for page_title, content in pages
+        ))
+    
     def _format_folder_content(self, folder_name: str) -> str:
         """Create content for a folder/parent page"""
         
-        confluence_content = f"""
-<ac:structured-macro ac:name="info" ac:schema-version="1">
-<ac:parameter ac:name="title">AI-Generated Project Folder</ac:parameter>
-<ac:rich-text-body>
-<p>This folder was automatically created by the AI Employee Workflow System on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-<p>This page contains related documentation for the project: {folder_name}</p>
-</ac:rich-text-body>
-</ac:structured-macro>
-
-<h1>Project Overview: {folder_name}</h1>
-<p>This folder contains all documentation related to this AI-generated project implementation.</p>
-
-<h2>Contents</h2>
-<p>Sub-pages will be automatically organized under this folder:</p>
-<ul>
-<li>Requirements Documentation</li>
-<li>Technical Design Specification</li>
-<li>Implementation Documentation</li>
-</ul>
-
-<ac:structured-macro ac:name="children" ac:schema-version="2">
-<ac:parameter ac:name="all">true</ac:parameter>
-</ac:structured-macro>
-"""
-        return confluence_content
+        return _FOLDER_TEMPLATE.format(
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            folder_name=folder_name
+        )
     
     def _format_content_for_confluence(self, markdown_content: str) -> str:
         """Convert markdown content to Confluence storage format"""
         
-        # Convert markdown to proper Confluence markup
-        confluence_content = self._convert_markdown_to_confluence(markdown_content)
+        return ''.join(self._iter_content_for_confluence(markdown_content))
+    
+    def _iter_content_for_confluence(self, markdown_content: str) -> Iterator[str]:
+        """Yield the Confluence storage format in chunks for streaming
+        
+        The markdown is converted as one document (the conversion is not section-local:
+        code fences, inline code and blank-line cleanup span headers); only the encoding
+        and upload of the result are streamed.
+        """
         
         # Add AI-generated info banner
-        full_content = f"""
-<ac:structured-macro ac:name="info" ac:schema-version="1">
-<ac:parameter ac:name="title">AI-Generated Documentation</ac:parameter>
-<ac:rich-text-body>
-<p>This page was automatically generated by the AI Employee Workflow System on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-</ac:rich-text-body>
-</ac:structured-macro>
-
-{confluence_content}
-"""
-        return full_content
+        header, footer = _PAGE_TEMPLATE.split('{content}')
+        yield header.format(timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        
+        # Convert markdown to proper Confluence markup
+        yield from _iter_chunks(self._convert_markdown_to_confluence(markdown_content))
+        
+        yield footer
     
     def _convert_markdown_to_confluence(self, markdown_content: str) -> str:
         """Convert markdown content to Confluence storage format with proper code blocks"""
-        import re
         
         content = markdown_content.strip()
         
@@ -253,37 +327,28 @@ class ConfluenceIntegration:
         content = re.sub(r'\*\*([^\*]+)\*\*', r'<strong>\1</strong>', content)
         content = re.sub(r'\*([^\*\n]+)\*', r'<em>\1</em>', content)
         
-        # Simple paragraph and list processing
-        lines = content.split('\n')
-        processed_lines = []
-        
-        for line in lines:
-            stripped = line.strip()
+        # Simple paragraph and list processing in a single regex pass
+        def process_line(match):
+            stripped = match.group('stripped')
+            kind = match.group('kind')
             
             if not stripped:
-                processed_lines.append('')
-                continue
+                return ''
             
             # Handle lists
-            if stripped.startswith('- '):
-                item_content = stripped[2:].strip()
-                processed_lines.append(f'<p>• {item_content}</p>')
-                continue
-            elif re.match(r'^\d+\. ', stripped):
-                processed_lines.append(f'<p>{stripped}</p>')
-                continue
+            if kind == '- ':
+                return f'<p>• {stripped[2:].lstrip()}</p>'
+            elif kind and kind[0].isdigit():
+                return f'<p>{stripped}</p>'
             
             # If it's already HTML (headers, code blocks), keep it
-            if (stripped.startswith('<h') or 
-                stripped.startswith('<ac:structured-macro') or
-                stripped.endswith('</ac:structured-macro>')):
-                processed_lines.append(line)
-            else:
-                # Regular paragraph
-                if stripped:
-                    processed_lines.append(f'<p>{stripped}</p>')
+            if kind or stripped.endswith('</ac:structured-macro>'):
+                return match.group(0)
+            
+            # Regular paragraph
+            return f'<p>{stripped}</p>'
         
-        result = '\n'.join(processed_lines)
+        result = _LINE_RE.sub(process_line, content)
         
         # Clean up extra whitespace
         result = re.sub(r'\n\s*\n\s*\n', '\n\n', result)
@@ -308,36 +373,31 @@ class ConfluenceIntegration:
         }
         
         try:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.put(
-                    f"{self.api_base}/content/{page_id}",
-                    json=page_data,
-                    headers=self.headers
-                ) as response:
+            session = await self._get_session()
+            async with session.put(
+                f"{self.api_base}/content/{page_id}",
+                json=page_data,
+                headers=self.headers
+            ) as response:
+                
+                if response.status == 200:
+                    result = orjson.loads(await response.read())
+                    page_url = f"{self.base_url}/wiki{result['_links']['webui']}"
+                    
+                    return {
+                        "success": True,
+                        "page_id": result["id"],
+                        "page_url": page_url,
+                        "message": f"Successfully updated Confluence page"
+                    }
+                else:
+                    error_text = await response.text()
+                    return {
+                        "success": False,
+                        "error": f"HTTP {response.status}",
+                        "message": f"Failed to update Confluence page: {error_text}"
+                    }
                     
-                    if response.status == 200:
-                        result = await response.json()
-                        page_url = f"{self.base_url}/wiki{result['_links']['webui']}"
-                        
-                        return {
-                            "success": True,
-                            "page_id": result["id"],
-                            "page_url": page_url,
-                            "message": f"Successfully updated Confluence page"
-                        }
-                    else:
-                        error_text = await response.text()
-                        return {
-                            "success": False,
-                            "error": f"HTTP {response.status}",
-                            "message": f"Failed to update Confluence page: {error_text}"
-                        }
-                        
         except Exception as e:
             return {
                 "success": False,
@@ -355,7 +415,13 @@ except Exception as e:
         async def create_project_page(self, project_name, content, parent_page_id=None):
             return {"success": False, "error": "Confluence integration not initialized", "message": "Confluence integration not configured"}
         
+        async def create_project_pages(self, parent_page_id, pages):
+            return [await self.create_project_page(title, content, parent_page_id) for title, content in pages]
+        
         async def update_page(self, page_id, new_content, version):
             return {"success": False, "error": "Confluence integration not initialized", "message": "Confluence integration not configured"}
+        
+        async def close(self):
+            pass
     
     confluence_integration = DummyConfluenceIntegration()
\ No newline at end of file
@@ -1,11 +1,29 @@
 # Git integration for repository cloning, branch management, and PR operations
 
+import aiohttp
+import asyncio
 import git
+import orjson
 import os
+import re
+import ssl
 from pathlib import Path
 from typing import Dict, Any, Optional
 from urllib.parse import urlparse
 
+# Repository URL format: https://dsgithub.trendmicro.com/owner/repo(.git)
+_REPO_URL_RE = re.compile(r'https://([^/]+)/([^/]+)/([^/]+?)(?:\.git)?(?:/|$)')
+
+# Shared SSL context for corporate networks - built once instead of per request
+_SSL_CTX = ssl.create_default_context()
+_SSL_CTX.check_hostname = False
+_SSL_CTX.verify_mode = ssl.CERT_NONE
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize request payloads with orjson instead of the stdlib encoder"""
+    return orjson.dumps(obj).decode()
+
 class GitIntegration:
     """
     Handles all git operations including:
@@ -20,6 +38,8 @@ class GitIntegration:
         self.git_config = config.get('integrations', {}).get('git', {})
         self.work_dir = None
         self.repo = None
+        self._token = os.environ.get('GITHUB_TOKEN') or os.environ.get('GITHUB_PERSONAL_ACCESS_TOKEN')
+        self._auth_url_cache: Dict[str, str] = {}
     
     def _add_auth_to_url(self, repo_url: str) -> str:
         """
@@ -31,8 +51,12 @@ class GitIntegration:
         Returns:
             URL with authentication token embedded
         """
-        # Get authentication token
-        github_token = os.environ.get('GITHUB_TOKEN') or os.environ.get('GITHUB_PERSONAL_ACCESS_TOKEN')
+        cached_url = self._auth_url_cache.get(repo_url)
+        if cached_url is not None:
+            return cached_url
+        
+        # Authentication token is resolved once in __init__
+        github_token = self._token
         if not github_token:
             print("⚠️  No GITHUB_TOKEN or GITHUB_PERSONAL_ACCESS_TOKEN found in environment, attempting clone without authentication")
             return repo_url
@@ -44,10 +68,12 @@ class GitIntegration:
         if parsed.scheme == 'https':
             # Format: https://token@hostname/path
             authenticated_url = f"https://{github_token}@{parsed.netloc}{parsed.path}"
-            return authenticated_url
+        else:
+            # For other schemes (like SSH), return as-is
+            authenticated_url = repo_url
         
-        # For other schemes (like SSH), return as-is
-        return repo_url
+        self._auth_url_cache[repo_url] = authenticated_url
+        return authenticated_url
     
     async def clone_reference_repo(self, repo_url: str, work_dir: str) -> Dict[str, Any]:
         """
@@ -66,32 +92,53 @@ class GitIntegration:
             
             print(f"🔄 Cloning reference repository: {repo_url}")
             
-            # Clone the repository
+            # Add authentication to the repo URL if GitHub token is available
+            authenticated_url = self._add_auth_to_url(repo_url)
+            
             repo_path = self.work_dir / "reference_repo"
+            if (repo_path / ".git").is_dir():
+                try:
+                    repo = git.Repo(repo_path)
+                    if repo.remote('origin').url == authenticated_url:
+                        # Same remote already cloned - fetch incrementally instead of re-cloning
+                        default_branch = self.git_config.get('default_branch', 'main')
+                        await asyncio.to_thread(repo.remote('origin').fetch)
+                        await asyncio.to_thread(repo.git.checkout, '-B', default_branch, f"origin/{default_branch}")
+                        await asyncio.to_thread(repo.git.reset, '--hard', f"origin/{default_branch}")
+                        await asyncio.to_thread(repo.git.clean, '-fdx')
+                        self.repo = repo
+                        
+                        print(f"✅ Updated existing clone at: {repo_path}")
+                        return self._clone_info(repo_url, repo_path, "updated_successfully")
+                except (ValueError, git.GitCommandError, git.InvalidGitRepositoryError) as e:
+                    # No origin, a broken .git or a failed update - fall back to a fresh clone
+                    print(f"⚠️ Could not reuse existing clone, re-cloning: {str(e)}")
+            
             if repo_path.exists():
-                # Remove existing clone
+                # Remove existing clone of a different remote
                 import shutil
-                shutil.rmtree(repo_path)
+                await asyncio.to_thread(shutil.rmtree, repo_path)
             
-            # Add authentication to the repo URL if GitHub token is available
-            authenticated_url = self._add_auth_to_url(repo_url)
-            self.repo = git.Repo.clone_from(authenticated_url, repo_path)
-            
-            clone_info = {
-                "repo_url": repo_url,
-                "local_path": str(repo_path),
-                "current_branch": self.repo.active_branch.name,
-                "latest_commit": self.repo.head.commit.hexsha,
-                "status": "cloned_successfully"
-            }
+            # Clone the repository off the event loop
+            self.repo = await asyncio.to_thread(git.Repo.clone_from, authenticated_url, repo_path)
             
             print(f"✅ Successfully cloned repository to: {repo_path}")
-            return clone_info
+            return self._clone_info(repo_url, repo_path, "cloned_successfully")
             
         except Exception as e:
             print(f"❌ Failed to clone repository: {str(e)}")
             raise
     
+    def _clone_info(self, repo_url: str, repo_path: Path, status: str) -> Dict[str, Any]:
+        """Build the clone information dictionary for the current repository"""
+        return {
+            "repo_url": repo_url,
+            "local_path": str(repo_path),
+            "current_branch": self.repo.active_branch.name,
+            "latest_commit": self.repo.head.commit.hexsha,
+            "status": status
+        }
+    
     async def create_feature_branch(self, feature_name: str) -> Dict[str, Any]:
         """
         Create a new feature branch for the AI-generated implementation
@@ -116,8 +163,8 @@ class GitIntegration:
             print(f"🌿 Creating feature branch: {branch_name}")
             
             # Create and checkout new branch
-            new_branch = self.repo.create_head(branch_name)
-            new_branch.checkout()
+            new_branch = await asyncio.to_thread(self.repo.create_head, branch_name)
+            await asyncio.to_thread(new_branch.checkout)
             
             branch_info = {
                 "branch_name": branch_name,
@@ -131,7 +178,7 @@ class GitIntegration:
             # Push the new branch to remote
             try:
                 origin = self.repo.remote('origin')
-                origin.push(refspec=f"{branch_name}:{branch_name}")
+                await asyncio.to_thread(origin.push, refspec=f"{branch_name}:{branch_name}")
                 print(f"✅ Successfully pushed branch to remote: {branch_name}")
                 branch_info["pushed_to_remote"] = True
             except Exception as push_error:
@@ -162,12 +209,9 @@ class GitIntegration:
             
             print(f"📝 Committing changes: {len(files)} files")
             
-            # Stage files
-            for file_path in files:
-                self.repo.index.add([file_path])
-            
-            # Commit changes
-            commit = self.repo.index.commit(commit_message)
+            # Stage files and commit off the event loop - GitPython blocks on subprocesses and index writes
+            await asyncio.to_thread(self.repo.index.add, list(files))
+            commit = await asyncio.to_thread(self.repo.index.commit, commit_message)
             
             commit_info = {
                 "commit_hash": commit.hexsha,
@@ -183,7 +227,7 @@ class GitIntegration:
             try:
                 origin = self.repo.remote('origin')
                 current_branch = self.repo.active_branch.name
-                origin.push(refspec=f"{current_branch}:{current_branch}")
+                await asyncio.to_thread(origin.push, refspec=f"{current_branch}:{current_branch}")
                 print(f"✅ Successfully pushed commits to remote")
                 commit_info["pushed_to_remote"] = True
             except Exception as push_error:
@@ -205,19 +249,19 @@ class GitIntegration:
             pattern: Optional glob pattern to filter files
             
         Returns:
-            List of file paths
+            List of tracked file paths, read from the git index
         """
         if not self.repo:
             return []
         
-        repo_path = Path(self.repo.working_dir)
-        
+        # -z: NUL-separated raw paths, not C-quoted for non-ASCII or special characters
         if pattern:
-            files = list(repo_path.glob(pattern))
+            # ":(glob)" magic keeps Path.glob semantics ('*' does not cross '/', '**' does)
+            output = self.repo.git.ls_files('-z', f":(glob){pattern}")
         else:
-            files = [f for f in repo_path.rglob('*') if f.is_file() and not f.name.startswith('.git')]
+            output = self.repo.git.ls_files('-z')
         
-        return [str(f.relative_to(repo_path)) for f in files]
+        return [path for path in output.split('\0') if path]
     
     def read_file_content(self, file_path: str) -> str:
         """
@@ -233,11 +277,10 @@ class GitIntegration:
             raise ValueError("Repository not initialized.")
         
         full_path = Path(self.repo.working_dir) / file_path
-        if not full_path.exists():
+        try:
+            return full_path.read_text(encoding='utf-8')
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
-        
-        with open(full_path, 'r', encoding='utf-8') as f:
-            return f.read()
     
     async def create_pull_request(self, title: str, description: str, target_branch: str = "main") -> Dict[str, Any]:
         """
@@ -260,7 +303,7 @@ class GitIntegration:
             print(f"🔀 Creating pull request: {current_branch} -> {target_branch}")
             
             # Extract repo info from remote URL
-            github_token = os.environ.get('GITHUB_TOKEN') or os.environ.get('GITHUB_PERSONAL_ACCESS_TOKEN')
+            github_token = self._token
             repo_url = os.environ.get('GITHUB_REPO_URL')
             
             if not github_token or not repo_url:
@@ -275,19 +318,13 @@ class GitIntegration:
                 }
             
             # Parse repo owner and name from URL
-            # Format: https://dsgithub.trendmicro.com/owner/repo
-            import re
-            match = re.search(r'https://([^/]+)/([^/]+)/([^/]+)/?', repo_url)
+            match = _REPO_URL_RE.search(repo_url)
             if not match:
                 raise ValueError(f"Could not parse repository URL: {repo_url}")
             
             github_host, owner, repo_name = match.groups()
-            repo_name = repo_name.replace('.git', '')
             
             # Create PR using GitHub API
-            import aiohttp
-            import ssl
-            
             api_url = f"https://{github_host}/api/v3/repos/{owner}/{repo_name}/pulls"
             
             pr_data = {
@@ -303,16 +340,11 @@ class GitIntegration:
                 "Content-Type": "application/json"
             }
             
-            # Create SSL context for corporate networks
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=connector) as session:
+            connector = aiohttp.TCPConnector(ssl=_SSL_CTX, limit=32)
+            async with aiohttp.ClientSession(connector=connector, json_serialize=_json_dumps) as session:
                 async with session.post(api_url, json=pr_data, headers=headers) as response:
                     if response.status == 201:
-                        result = await response.json()
+                        result = orjson.loads(await response.read())
                         pr_url = result.get("html_url", "")
                         pr_number = result.get("number", "")
                         
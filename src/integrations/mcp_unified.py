@@ -1,13 +1,21 @@
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_mcp_adapters.tools import load_mcp_tools
-from dotenv import load_dotenv
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+import anyio
 import asyncio
+import logging
 import os
 import json
-from typing import Dict, Any, List, Optional
+import time
+import warnings
+from contextlib import AsyncExitStack, asynccontextmanager
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
+from src.utils.env import load_env_once
 
 # Load environment variables
-load_dotenv()
+load_env_once()
+
+logger = logging.getLogger(__name__)
 
 # MCP Tools Provider - Atlassian + GitHub Enterprise
 # ==================================================
@@ -24,6 +32,242 @@ load_dotenv()
 # 2. GitHub MCP binary in same directory
 # 3. Valid environment variables set
 
+# Static pieces of format_agent_response output
+_HEADER = "=" * 60
+_DIVIDER = "-" * 40
+_ATLASSIAN_TOOL_PREFIXES = ('mcp_my-atlassian', 'searchJiraIssuesUsingJql', 'searchConfluenceUsingCql')
+
+# Note attached to every run_with_unified_agent compatibility response
+_DEPRECATED_NOTE = "Please integrate MCP tools with your agent using get_all_tools()"
+
+class LazyMCPTool:
+    """Lightweight stand-in for an MCP tool - the LangChain tool is only built on first invoke"""
+    
+    def __init__(self, provider: "MCPToolsProvider", name: str, description: str):
+        self.name = name
+        self.description = description
+        self._provider = provider
+    
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs) -> Any:
+        tool = await self._provider.get_tool(self.name)
+        return await tool.ainvoke(input, config, **kwargs)
+    
+    def __repr__(self) -> str:
+        return f"LazyMCPTool(name={self.name!r})"
+
+
+async def _list_tool_definitions(session) -> List[Any]:
+    """Fetch the raw tool definitions from an MCP session, following pagination"""
+    definitions = []
+    cursor = None
+    while True:
+        result = await session.list_tools(cursor=cursor)
+        definitions.extend(result.tools)
+        cursor = result.nextCursor
+        if not cursor:
+            return definitions
+
+
+_GITHUB_BINARY = os.path.join(os.path.dirname(__file__), "github-mcp-server")
+_GITHUB_HOST = "https://dsgithub.trendmicro.com"  # GitHub Enterprise Server
+
+
+@lru_cache(maxsize=1)
+def _mcp_server_config() -> Dict[str, Any]:
+    """Server configuration for the MCP client, built once from the loaded environment"""
+    return {
+        "atlassian": {
+            "command": "npx",
+            "args": ["-y", "mcp-remote", os.getenv("ATLASSIAN_MCP_SERVER_URL", "https://mcp.atlassian.com/v1/sse")],
+            "transport": "stdio",
+        },
+        "github": {
+            "command": _GITHUB_BINARY,
+            "args": ["stdio"],
+            "transport": "stdio",
+            "env": {
+                "GITHUB_PERSONAL_ACCESS_TOKEN": os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN"),
+                "GITHUB_HOST": _GITHUB_HOST  # Configure for GitHub Enterprise Server
+            }
+        }
+    }
+
+
+@lru_cache(maxsize=1)
+def _get_mcp_client() -> MultiServerMCPClient:
+    """Process-wide MCP client shared by every MCPToolsProvider"""
+    return MultiServerMCPClient(_mcp_server_config())
+
+
+_SERVER_NAMES = ("atlassian", "github")
+
+# Errors meaning a session's transport is dead; the session is evicted instead of reused
+_DEAD_SESSION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, ConnectionError)
+
+# Idle sessions are pinged before reuse; a failed ping reconnects that server only
+_PING_AFTER_IDLE_SECONDS = 60.0
+_PING_TIMEOUT_SECONDS = 5.0
+
+# Process-wide MCP session pool keyed by server name, so providers share one set of
+# server processes. Sessions live on the event loop that opened them.
+_SESSIONS: Dict[str, Any] = {}
+_TOOL_DEFINITIONS: Dict[str, List[Any]] = {}
+_SESSION_CLOSERS: Dict[str, Callable[[], Awaitable[None]]] = {}
+_LAST_USED: Dict[str, float] = {}
+_session_users = 0
+_session_lock: Optional[asyncio.Lock] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_session_lock() -> asyncio.Lock:
+    """Return the pool lock for the running loop, forgetting sessions of a previous loop"""
+    global _session_lock, _session_loop, _session_users
+    loop = asyncio.get_running_loop()
+    if _session_loop is not loop:
+        # Sessions were held by tasks of the previous loop and are gone with it
+        _SESSIONS.clear()
+        _TOOL_DEFINITIONS.clear()
+        _SESSION_CLOSERS.clear()
+        _LAST_USED.clear()
+        _session_users = 0
+        _session_lock = asyncio.Lock()
+        _session_loop = loop
+    return _session_lock
+
+
+async def _open_session(client: MultiServerMCPClient, server_name: str) -> Tuple[Any, Callable[[], Awaitable[None]]]:
+    """Open an MCP session held by a dedicated task, returning the session and its closer
+    
+    The session context manager is entered and exited inside the same task, which the
+    anyio scopes used by the stdio transport require, while several servers can still
+    complete their handshakes concurrently.
+    """
+    ready = asyncio.get_running_loop().create_future()
+    stop = asyncio.Event()
+    
+    async def hold_session():
+        try:
+            async with client.session(server_name) as session:
+                ready.set_result(session)
+                await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                raise
+    
+    task = asyncio.create_task(hold_session())
+    session = await ready
+    
+    async def close_session():
+        stop.set()
+        await task
+    
+    return session, close_session
+
+
+def _pooled(server_names: Tuple[str, ...]) -> bool:
+    """Whether the pool holds live-loop sessions for all server_names"""
+    return _session_loop is asyncio.get_running_loop() and all(name in _SESSIONS for name in server_names)
+
+
+async def _open_missing_sessions(client: MultiServerMCPClient, server_names: Tuple[str, ...]) -> None:
+    """Open (concurrently) the pooled sessions that are missing - call with the pool lock held"""
+    missing = [name for name in server_names if name not in _SESSIONS]
+    if not missing:
+        return
+    logger.info("⏳ Establishing MCP sessions: %s...", ", ".join(missing))
+    opened = await asyncio.gather(
+        *(_open_session(client, name) for name in missing),
+        return_exceptions=True
+    )
+    errors = [result for result in opened if isinstance(result, BaseException)]
+    opened_names = [name for name, result in zip(missing, opened) if not isinstance(result, BaseException)]
+    for name, result in zip(missing, opened):
+        if not isinstance(result, BaseException):
+            _SESSIONS[name], _SESSION_CLOSERS[name] = result
+    try:
+        if errors:
+            raise errors[0]
+        definitions = await asyncio.gather(*(_list_tool_definitions(_SESSIONS[name]) for name in missing))
+    except BaseException:
+        # Close what this call opened rather than leave half-initialized entries
+        # (sessions without tool definitions) in the pool
+        results = await asyncio.gather(
+            *(_close_session(name) for name in opened_names),
+            return_exceptions=True
+        )
+        for name, result in zip(opened_names, results):
+            if isinstance(result, Exception):
+                logger.warning("⚠️ Error closing %s MCP session (ignored): %s", name, result)
+        raise
+    _TOOL_DEFINITIONS.update(zip(missing, definitions))
+    now = time.monotonic()
+    for name in missing:
+        _LAST_USED[name] = now
+
+
+async def _acquire_sessions(client: MultiServerMCPClient, server_names: Tuple[str, ...]) -> None:
+    """Open any pooled sessions that are missing and register one more user"""
+    global _session_users
+    async with _get_session_lock():
+        await _open_missing_sessions(client, server_names)
+        _session_users += 1
+
+
+async def _restore_sessions(client: MultiServerMCPClient, server_names: Tuple[str, ...]) -> None:
+    """Reopen pooled sessions that went missing for an already registered user
+    
+    Entries disappear when a reconnect fails, or when the pool is reset for a new event
+    loop - in that case the user count was reset too, so the caller is counted again.
+    """
+    global _session_users
+    async with _get_session_lock():
+        await _open_missing_sessions(client, server_names)
+        _session_users = max(_session_users, 1)
+
+
+def _mark_used(server_names: Tuple[str, ...]) -> None:
+    """Record that pooled sessions were just used"""
+    now = time.monotonic()
+    for server_name in server_names:
+        _LAST_USED[server_name] = now
+
+
+async def _reopen_session(client: MultiServerMCPClient, server_name: str) -> None:
+    """Replace one pooled session with a fresh connection, leaving the other servers untouched"""
+    async with _get_session_lock():
+        try:
+            await _close_session(server_name)
+        except Exception as e:
+            logger.warning("⚠️ Error closing broken %s MCP session (ignored): %s", server_name, e)
+        await _open_missing_sessions(client, (server_name,))
+
+
+async def _close_session(server_name: str) -> None:
+    """Drop a pooled session and shut down its server connection"""
+    _SESSIONS.pop(server_name, None)
+    _TOOL_DEFINITIONS.pop(server_name, None)
+    _LAST_USED.pop(server_name, None)
+    closer = _SESSION_CLOSERS.pop(server_name, None)
+    if closer:
+        await closer()
+
+
+async def _release_sessions() -> None:
+    """Unregister one user and close every pooled session once nobody uses them"""
+    global _session_users
+    async with _get_session_lock():
+        _session_users = max(_session_users - 1, 0)
+        if _session_users == 0:
+            # Close every server even if one of them fails to shut down cleanly
+            names = list(_SESSION_CLOSERS)
+            results = await asyncio.gather(*(_close_session(name) for name in names), return_exceptions=True)
+            for name, result in zip(names, results):
+                if isinstance(result, Exception):
+                    logger.warning("⚠️ Error closing %s MCP session (ignored): %s", name, result)
+
+
 class MCPToolsProvider:
     """Pure MCP tools provider - no AI model, just tools for external agents"""
     
@@ -36,53 +280,71 @@ class MCPToolsProvider:
         self.atlassian_session = None
         self.github_session = None
         self.sessions_initialized = False
+        self._exit_stack = AsyncExitStack()
+        # Created on first use in the running loop (on Python 3.9 a Lock binds to the loop
+        # current at construction time)
+        self._init_lock: Optional[asyncio.Lock] = None
+        self._init_lock_loop: Optional[asyncio.AbstractEventLoop] = None
         
-        # Tool collections
+        # Tool collections - raw MCP tool definitions (name, description, schema)
         self.atlassian_tools = []
         self.github_tools = []
         
-        # Configuration
-        load_dotenv()
-        self.confluence_space_key = os.getenv('CONFLUENCE_SPACE_KEY')
+        # Tool name -> (server name, MCP tool definition), and LangChain tools built on demand
+        self._tool_index: Dict[str, Tuple[str, Any]] = {}
+        self._materialized_tools: Dict[str, Any] = {}
+        
+        # Configuration (.env was already loaded at import)
+        self._set_confluence_space_key(os.getenv('CONFLUENCE_SPACE_KEY'))
+    
+    def _set_confluence_space_key(self, space_key: Optional[str]):
+        """Store the Confluence space key and the query text built from it"""
+        self.confluence_space_key = space_key
+        if space_key:
+            self._space_suffix = f" IMPORTANT: Create this page specifically in the Confluence space with key '{space_key}'. Do not use any other space or default space."
+            self._space_prefix = f"In Confluence space '{space_key}': "
+        else:
+            self._space_suffix = self._space_prefix = ""
         
     def format_agent_response(self, response: Dict[str, Any]) -> str:
         """Format agent response for better human readability"""
-        formatted_output = []
+        if not isinstance(response, dict):
+            return str(response)
         
-        # Add header
-        formatted_output.append("=" * 60)
-        formatted_output.append("🤖 UNIFIED MCP AGENT RESPONSE")
-        formatted_output.append("=" * 60)
+        parts = [_HEADER, "🤖 UNIFIED MCP AGENT RESPONSE", _HEADER]
         
         # Extract the main message content
-        if 'messages' in response:
-            messages = response['messages']
-            if isinstance(messages, list) and len(messages) > 0:
-                # Get the last message (usually the final response)
-                final_message = messages[-1]
-                if hasattr(final_message, 'content'):
-                    formatted_output.append("\n📝 RESPONSE:")
-                    formatted_output.append("-" * 40)
-                    formatted_output.append(final_message.content)
-                    
-                # Show any tool calls that were made
-                tool_calls = []
-                for msg in messages:
-                    if hasattr(msg, 'additional_kwargs') and 'tool_calls' in msg.additional_kwargs:
-                        tool_calls.extend(msg.additional_kwargs['tool_calls'])
-                
-                if tool_calls:
-                    formatted_output.append("\n🔧 TOOLS USED:")
-                    formatted_output.append("-" * 40)
-                    for i, tool_call in enumerate(tool_calls, 1):
-                        if 'function' in tool_call:
-                            func_name = tool_call['function'].get('name', 'Unknown')
-                            # Add source indicator
-                            source = "📊" if func_name.startswith(('mcp_my-atlassian', 'searchJiraIssuesUsingJql', 'searchConfluenceUsingCql')) else "⚡"
-                            formatted_output.append(f"{i}. {source} {func_name}")
+        messages = response.get('messages')
+        if isinstance(messages, list) and messages:
+            # Get the last message (usually the final response)
+            final_message = messages[-1]
+            if hasattr(final_message, 'content'):
+                parts.extend(("", "📝 RESPONSE:", _DIVIDER, final_message.content))
+            
+            # Show any tool calls that were made
+            tool_calls = [
+                tool_call
+                for msg in messages
+                if hasattr(msg, 'additional_kwargs') and 'tool_calls' in msg.additional_kwargs
+                for tool_call in msg.additional_kwargs['tool_calls']
+            ]
+            if tool_calls:
+                parts.extend(("", "🔧 TOOLS USED:", _DIVIDER))
+                # Add source indicator
+                parts.extend(
+                    f"{i}. {'📊' if name.startswith(_ATLASSIAN_TOOL_PREFIXES) else '⚡'} {name}"
+                    for i, name in (
+                        (i, tool_call['function'].get('name', 'Unknown'))
+                        for i, tool_call in enumerate(tool_calls, 1)
+                        if 'function' in tool_call
+                    )
+                )
+        elif isinstance(messages, str):
+            # Plain-text responses (e.g. from run_with_unified_agent)
+            parts.extend(("", "📝 RESPONSE:", _DIVIDER, messages))
         
-        formatted_output.append("\n" + "=" * 60)
-        return "\n".join(formatted_output)
+        parts.extend(("", _HEADER))
+        return "\n".join(parts)
     
     async def initialize(self) -> bool:
         """Initialize the MCP tools provider with both servers"""
@@ -90,10 +352,10 @@ class MCPToolsProvider:
             # Load and validate environment variables
             github_pat = os.getenv("GITHUB_PERSONAL_ACCESS_TOKEN")
             atlassian_mcp_url = os.getenv("ATLASSIAN_MCP_SERVER_URL", "https://mcp.atlassian.com/v1/sse")
-            github_host = "https://dsgithub.trendmicro.com"  # GitHub Enterprise Server
+            github_host = _GITHUB_HOST
             
             # Load Confluence configuration for targeted space usage
-            self.confluence_space_key = os.getenv("CONFLUENCE_SPACE_KEY")
+            self._set_confluence_space_key(os.getenv("CONFLUENCE_SPACE_KEY"))
             self.confluence_base_url = os.getenv("CONFLUENCE_BASE_URL", "https://trendmicro.atlassian.net")
             
             # Validate required environment variables
@@ -102,99 +364,194 @@ class MCPToolsProvider:
                 missing_vars.append("GITHUB_PERSONAL_ACCESS_TOKEN")
                 
             if missing_vars:
-                print(f"❌ Missing required environment variables: {', '.join(missing_vars)}")
+                logger.error("❌ Missing required environment variables: %s", ", ".join(missing_vars))
                 return False
             
-            print(f"✅ Environment variables validated")
-            print(f"✅ GitHub PAT length: {len(github_pat)} characters")
-            print(f"✅ GitHub Enterprise Server: {github_host}")
-            print(f"✅ Atlassian MCP URL: {atlassian_mcp_url}")
+            logger.info("✅ Environment variables validated")
+            logger.debug("✅ GitHub PAT length: %d characters", len(github_pat))
+            logger.info("✅ GitHub Enterprise Server: %s", github_host)
+            logger.info("✅ Atlassian MCP URL: %s", atlassian_mcp_url)
             if self.confluence_space_key:
-                print(f"✅ Confluence Space Key: {self.confluence_space_key}")
+                logger.info("✅ Confluence Space Key: %s", self.confluence_space_key)
             else:
-                print(f"⚠️ No Confluence space key specified, will use default space")
+                logger.warning("⚠️ No Confluence space key specified, will use default space")
             
         except Exception as e:
-            print(f"❌ Error loading environment variables: {e}")
+            logger.error("❌ Error loading environment variables: %s", e)
             return False
         
-        # Configure MCP client with servers
+        # Configure MCP client with servers - one client is shared by all providers
         try:
-            github_binary_path = os.path.join(os.path.dirname(__file__), "github-mcp-server")
+            self.client = _get_mcp_client()
             
-            self.client = MultiServerMCPClient({
-                "atlassian": {
-                    "command": "npx",
-                    "args": ["-y", "mcp-remote", atlassian_mcp_url],
-                    "transport": "stdio",
-                },
-                "github": {
-                    "command": github_binary_path,
-                    "args": ["stdio"],
-                    "transport": "stdio",
-                    "env": {
-                        "GITHUB_PERSONAL_ACCESS_TOKEN": github_pat,
-                        "GITHUB_HOST": github_host  # Configure for GitHub Enterprise Server
-                    }
-                }
-            })
-            
-            print(f"🔗 Configured unified MCP client:")
-            print(f"   📊 Atlassian MCP: {atlassian_mcp_url}")
-            print(f"   ⚡ GitHub Enterprise: {github_host}")
-            print(f"   🛠️  GitHub binary: {github_binary_path}")
+            logger.info("🔗 Configured unified MCP client:")
+            logger.info("   📊 Atlassian MCP: %s", atlassian_mcp_url)
+            logger.info("   ⚡ GitHub Enterprise: %s", github_host)
+            logger.info("   🛠️  GitHub binary: %s", _GITHUB_BINARY)
             
         except Exception as e:
-            print(f"❌ Error configuring MCP client: {e}")
+            logger.error("❌ Error configuring MCP client: %s", e)
             return False
             
         return True
     
+    def _get_init_lock(self) -> asyncio.Lock:
+        """Return the initialization lock for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._init_lock is None or self._init_lock_loop is not loop:
+            self._init_lock = asyncio.Lock()
+            self._init_lock_loop = loop
+        return self._init_lock
+
     async def _ensure_sessions_initialized(self):
         """Ensure MCP sessions are initialized, creating them if needed"""
         if not self.sessions_initialized:
-            print("⏳ Establishing MCP sessions...")
-            
-            # Create and enter session contexts
-            self.atlassian_session_cm = self.client.session("atlassian")
-            self.github_session_cm = self.client.session("github")
-            
-            # Enter the contexts
-            self.atlassian_session = await self.atlassian_session_cm.__aenter__()
-            self.github_session = await self.github_session_cm.__aenter__()
-            
-            print("✅ Both MCP sessions initialized")
-            
-            # Load tools from both servers
-            self.atlassian_tools = await load_mcp_tools(self.atlassian_session)
-            self.github_tools = await load_mcp_tools(self.github_session)
-            
-            print(f"✅ Loaded {len(self.atlassian_tools)} tools from Atlassian MCP server")
-            print(f"✅ Loaded {len(self.github_tools)} tools from GitHub MCP server")
-            
-            # Store all tools for external use (no agent creation here)
-            all_tools = self.atlassian_tools + self.github_tools
-            total_tools = len(all_tools)
-            
-            print(f"✅ MCP tools ready for external agent: {total_tools} total tools")
-            print(f"   📊 Atlassian: {len(self.atlassian_tools)} tools")
-            print(f"   ⚡ GitHub: {len(self.github_tools)} tools")
-            
-            self.sessions_initialized = True
+            # Double-checked: concurrent first callers wait for one initialization
+            async with self._get_init_lock():
+                if not self.sessions_initialized:
+                    # Sessions and tool definitions come from the process-wide pool; concurrent
+                    # providers wait on its lock instead of spawning duplicate server processes
+                    await _acquire_sessions(self.client, _SERVER_NAMES)
+                    self._exit_stack.push_async_callback(_release_sessions)
+                    self._sync_with_pool()
+                    
+                    logger.info("✅ Both MCP sessions initialized")
+                    logger.info("✅ Indexed %d tools from Atlassian MCP server", len(self.atlassian_tools))
+                    logger.info("✅ Indexed %d tools from GitHub MCP server", len(self.github_tools))
+                    
+                    total_tools = len(self.atlassian_tools) + len(self.github_tools)
+                    
+                    logger.info("✅ MCP tools ready for external agent: %d total tools", total_tools)
+                    logger.info("   📊 Atlassian: %d tools", len(self.atlassian_tools))
+                    logger.info("   ⚡ GitHub: %d tools", len(self.github_tools))
+                    
+                    self.sessions_initialized = True
+                    _mark_used(_SERVER_NAMES)
+                    return
+        
+        logger.debug("🔄 Reusing existing MCP sessions...")
+        await self._require_sessions(_SERVER_NAMES)
+        
+        # Sessions idle for a while get a cheap ping; a dead one is reopened on its own
+        now = time.monotonic()
+        for server_name in _SERVER_NAMES:
+            if now - _LAST_USED.get(server_name, now) <= _PING_AFTER_IDLE_SECONDS:
+                continue
+            try:
+                await asyncio.wait_for(_SESSIONS[server_name].send_ping(), timeout=_PING_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.warning("⚠️ %s MCP session failed liveness check (%r), reconnecting...", server_name, e)
+                try:
+                    await _reopen_session(self.client, server_name)
+                except Exception as reopen_err:
+                    raise ConnectionError(f"MCP session unavailable for {server_name}: {reopen_err}") from reopen_err
+        self._sync_with_pool()
+        _mark_used(_SERVER_NAMES)
+
+    async def _require_sessions(self, server_names: Tuple[str, ...]):
+        """Make sure the pool holds sessions for server_names, reconnecting missing ones"""
+        if _pooled(server_names):
+            return
+        try:
+            await _restore_sessions(self.client, server_names)
+        except Exception as e:
+            missing = [name for name in server_names if name not in _SESSIONS]
+            raise ConnectionError(f"MCP session unavailable for {', '.join(missing or server_names)}: {e}") from e
+
+    def _sync_with_pool(self):
+        """Point this provider at the pooled sessions and index their tool names and descriptions
+        
+        LangChain tools are only built when a tool is actually selected.
+        """
+        self.atlassian_session = _SESSIONS["atlassian"]
+        self.github_session = _SESSIONS["github"]
+        self.atlassian_tools = _TOOL_DEFINITIONS["atlassian"]
+        self.github_tools = _TOOL_DEFINITIONS["github"]
+        self._tool_index = {tool.name: ("atlassian", tool) for tool in self.atlassian_tools}
+        self._tool_index.update((tool.name, ("github", tool)) for tool in self.github_tools)
+
+    def _materialize_tool(self, name: str) -> Any:
+        """Build (once) the LangChain tool for an indexed MCP tool"""
+        if name not in self._tool_index:
+            raise KeyError(f"Unknown MCP tool: {name}")
+        cached = self._materialized_tools.get(name)
+        if cached is not None:
+            return cached
+        
+        server_name, definition = self._tool_index[name]
+        # May be missing until the next call reconnects it; the wrapper re-binds either way
+        session = _SESSIONS.get(server_name)
+        tool = convert_mcp_tool_to_langchain_tool(session, definition)
+        # The session the current coroutine is bound to; agents keep tools for their whole
+        # life, so every call re-binds to whatever session the pool holds right now
+        bound = [session, tool.coroutine]
+        
+        async def call_tool_in_session(*args, **kwargs):
+            # Agents invoke the tool directly, so route every call through session_for
+            async with self.session_for(server_name) as current:
+                if current is not bound[0]:
+                    bound[:] = [current, convert_mcp_tool_to_langchain_tool(current, definition).coroutine]
+                return await bound[1](*args, **kwargs)
+        
+        tool.coroutine = call_tool_in_session
+        self._materialized_tools[name] = tool
+        return tool
+
+    @asynccontextmanager
+    async def session_for(self, server_name: str):
+        """Use a pooled session, evicting and reconnecting it if its transport turns out dead
+        
+        Usage: async with provider.session_for("github") as session: await session.call_tool(...)
+        """
+        if not self.sessions_initialized:
+            raise RuntimeError("Sessions not initialized. Call initialize() and _ensure_sessions_initialized() first.")
+        
+        if not _pooled((server_name,)):
+            await self._require_sessions(_SERVER_NAMES)
+            self._sync_with_pool()
+        
+        try:
+            yield _SESSIONS[server_name]
+        except _DEAD_SESSION_ERRORS as e:
+            logger.warning("⚠️ %s MCP session is dead (%r), reconnecting before next use...", server_name, e)
+            try:
+                await _reopen_session(self.client, server_name)
+                self._sync_with_pool()
+            except Exception as reopen_err:
+                logger.error("❌ Failed to reconnect %s MCP session: %s", server_name, reopen_err)
+            raise
         else:
-            print("🔄 Reusing existing MCP sessions...")
+            _mark_used((server_name,))
+
+    async def get_tool(self, name: str) -> Any:
+        """Get a single MCP tool as a LangChain tool, building it on first use"""
+        await self._ensure_sessions_initialized()
+        return self._materialize_tool(name)
 
-    def get_all_tools(self) -> List[Any]:
-        """Get all MCP tools for use by external agents"""
+    def get_all_tools(self, lazy: bool = False) -> List[Any]:
+        """Get all MCP tools for use by external agents
+        
+        Returns full LangChain tools. Pass lazy=True for lightweight LazyMCPTool proxies
+        (name, description and ainvoke only) that build the LangChain tool on first invoke.
+        """
         if not self.sessions_initialized:
             raise RuntimeError("Tools not initialized. Call initialize() and _ensure_sessions_initialized() first.")
         
-        return self.atlassian_tools + self.github_tools
+        if lazy:
+            return [
+                LazyMCPTool(self, name, definition.description or "")
+                for name, (_, definition) in self._tool_index.items()
+            ]
+        return [self._materialize_tool(name) for name in self._tool_index]
 
     async def execute_mcp_query(self, query: str, tool_name: str = None) -> Optional[Dict[str, Any]]:
-        """Execute a query using specific MCP tools (helper method for external agents)"""
+        """Execute a query using specific MCP tools (helper method for external agents)
+        
+        Calls share the provider's sessions, so several queries can be awaited together
+        with asyncio.gather within one agent step.
+        """
         if not self.client:
-            print("❌ Client not initialized. Call initialize() first.")
+            logger.error("❌ Client not initialized. Call initialize() first.")
             return None
             
         try:
@@ -203,13 +560,13 @@ class MCPToolsProvider:
             
             # This is a helper method - actual execution should be done by the external agent
             # that has access to the tools via get_all_tools()
-            print(f"📝 Query received: {query}")
-            print(f"⚠️ Note: This method is for compatibility. External agents should use get_all_tools()")
+            logger.debug("📝 Query received: %s", query)
+            logger.debug("⚠️ Note: This method is for compatibility. External agents should use get_all_tools()")
             
             return {"query": query, "status": "tools_available", "note": "Use get_all_tools() for agent integration"}
                     
         except Exception as e:
-            print(f"❌ Error in MCP query execution: {e}")
+            logger.error("❌ Error in MCP query execution: %s", e)
             return None
     
     def get_tool_summary(self) -> Dict[str, int]:
@@ -221,62 +578,38 @@ class MCPToolsProvider:
         }
 
     async def cleanup(self):
-        """Clean up MCP sessions and client resources with aggressive task context management"""
+        """Clean up MCP sessions and client resources
+        
+        Teardown errors propagate to the caller; provider state is reset either way.
+        """
+        logger.info("🧹 Cleaning up MCP sessions...")
         try:
-            print("🧹 Cleaning up MCP sessions...")
-            
-            # Try to cleanup in the same task context
-            if self.sessions_initialized and self.client:
-                try:
-                    # Force cleanup of sessions within current task context
-                    print("🔄 Attempting graceful session cleanup...")
-                    
-                    # Note: No agent cleanup needed - this is a pure tools provider
-                    
-                    # Try to cleanup the client sessions
-                    if hasattr(self.client, 'close') or hasattr(self.client, 'cleanup'):
-                        try:
-                            if hasattr(self.client, 'close'):
-                                await self.client.close()
-                            elif hasattr(self.client, 'cleanup'):
-                                await self.client.cleanup()
-                        except Exception as client_err:
-                            print(f"⚠️ Client cleanup error (ignored): {client_err}")
-                
-                except Exception as session_cleanup_err:
-                    print(f"⚠️ Session cleanup error (ignored): {session_cleanup_err}")
-            
-            # Reset our state regardless of cleanup success
+            # Release the pooled sessions through the exit stack - the last user closes them
+            await self._exit_stack.aclose()
+        finally:
             self.sessions_initialized = False
-            print("🔄 Session state reset")
-                
-            # Clear references but don't try to close them manually
+            self._exit_stack = AsyncExitStack()
             self.atlassian_session = None
             self.github_session = None
             self.atlassian_tools = []
             self.github_tools = []
-            
-            # Let the client cleanup naturally when it goes out of scope
-            # DO NOT call client cleanup methods that might interfere with async contexts
+            self._tool_index = {}
+            self._materialized_tools = {}
             self.client = None
-                
-            print("🧹 MCP client cleaned up successfully")
-        except Exception as e:
-            print(f"⚠️ Error during MCP cleanup: {e}")
+        logger.info("🧹 MCP client cleaned up successfully")
 
     def format_confluence_query(self, query: str) -> str:
         """Format a Confluence query with the configured space"""
-        if self.confluence_space_key:
-            # Insert space information into the query
-            if "create" in query.lower() and "confluence" in query.lower():
-                # For page creation queries, add explicit space specification with more detail
-                space_spec = f" IMPORTANT: Create this page specifically in the Confluence space with key '{self.confluence_space_key}'. Do not use any other space or default space."
-                return query + space_spec
-            else:
-                # For other queries, add space context
-                return f"In Confluence space '{self.confluence_space_key}': {query}"
-        else:
+        if not self._space_suffix:
             return query
+        
+        # Insert space information into the query
+        low = query.lower()
+        if "create" in low and "confluence" in low:
+            # For page creation queries, add explicit space specification with more detail
+            return query + self._space_suffix
+        # For other queries, add space context
+        return self._space_prefix + query
 
     # Compatibility methods for existing workflow_agent.py
     async def run_with_unified_agent(self, queries: List[str]) -> List[Optional[Dict[str, Any]]]:
@@ -284,25 +617,17 @@ class MCPToolsProvider:
         DEPRECATED: Compatibility method for existing workflow_agent.py
         Use get_all_tools() and integrate with your own agent instead
         """
-        print("⚠️ DEPRECATED: run_with_unified_agent() should be replaced with get_all_tools()")
-        print("💡 External agents should create their own agent with MCP tools")
+        # Aimed at developers: the default filters only show DeprecationWarning when it is
+        # attributed to __main__ (or under -W default / pytest), not to importing modules
+        warnings.warn(
+            "run_with_unified_agent() is deprecated; external agents should create their own "
+            "agent with the MCP tools from get_all_tools()",
+            DeprecationWarning,
+            stacklevel=2
+        )
         
-        results = []
-        for query in queries:
-            # Simulate response format that workflow_agent expects
-            results.append({
-                "messages": f"MCP tools available for query: {query}",
-                "note": "Please integrate MCP tools with your agent using get_all_tools()"
-            })
-        return results
-
-    def format_agent_response(self, response: Dict[str, Any]) -> str:
-        """
-        COMPATIBILITY: Format agent response for display
-        """
-        if isinstance(response, dict):
-            return response.get("messages", str(response))
-        return str(response)
+        # Simulate response format that workflow_agent expects
+        return [{"messages": f"MCP tools available for query: {query}", "note": _DEPRECATED_NOTE} for query in queries]
 
 
 # Create an alias for backward compatibility
@@ -1,14 +1,146 @@
 # Slack integration for workflow notifications
 
 import os
+import re
+import ssl
 import asyncio
-import json
+import logging
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import aiohttp
-from dotenv import load_dotenv
+import certifi
+import orjson
+from src.utils.env import load_env_once
 
-load_dotenv()
+load_env_once()
+
+logger = logging.getLogger(__name__)
+
+# URL formats found in MCP responses (Confluence/GitHub URLs) as one alternation, so the
+# text is scanned once; the leftmost match wins and the named group says which form hit
+_URL_ALT = re.compile(
+    r'(?:\[View Page\]\((?P<vp>https://[^\)]+)\))'      # Markdown "View Page" link
+    r'|(?:\[[^\]]*\]\((?P<md>https://[^\)]+)\))'        # Any markdown link
+    r'|(?P<bare>https://[^\s\)\]]+(?:\([^\)]*\))?)',    # Standard URLs
+    re.IGNORECASE,
+)
+
+# Static Slack block skeletons for workflow completion messages; string fields are
+# str.format templates filled per message by _fill_blocks
+_BLOCKS_SKELETON = (
+    {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": "🤖 AI Employee Completed: {project_name}"
+        }
+    },
+    {
+        "type": "section",
+        "fields": [
+            {
+                "type": "mrkdwn",
+                "text": "*Project:*\n{project_name}"
+            },
+            {
+                "type": "mrkdwn",
+                "text": "*Transcript:*\n{transcript_file}"
+            },
+            {
+                "type": "mrkdwn",
+                "text": "*Completed:*\n{completed}"
+            }
+        ]
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "*Summary:*\n{summary}"
+        }
+    }
+)
+
+_PR_BUTTON_SKELETON = {
+    "type": "button",
+    "text": {
+        "type": "plain_text",
+        "text": "📥 Review Pull Request"
+    },
+    "url": "{pr_url}",
+    "style": "primary"
+}
+
+_DOCS_BUTTON_SKELETON = {
+    "type": "button",
+    "text": {
+        "type": "plain_text",
+        "text": "📚 View Documentation"
+    },
+    "url": "{confluence_folder_url}"
+}
+
+_FOOTER_BLOCK = {
+    "type": "context",
+    "elements": [
+        {
+            "type": "mrkdwn",
+            "text": "🚀 Generated by AI Employee Workflow System"
+        }
+    ]
+}
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_DIVIDER_BLOCK = {"type": "divider"}
+
+# Batching of workflow completion notifications (send_workflow_completion(batch=True))
+_BATCH_WINDOW_SECONDS = 0.3
+_MAX_BATCH = 20
+_MAX_BLOCKS_PER_MESSAGE = 50  # Slack's limit for chat.postMessage
+
+def _fill_blocks(skeleton: Any, subs: Dict[str, Any]) -> Any:
+    """Copy a block skeleton, formatting every string field with subs"""
+    if isinstance(skeleton, str):
+        return skeleton.format_map(subs)
+    if isinstance(skeleton, dict):
+        return {key: _fill_blocks(value, subs) for key, value in skeleton.items()}
+    if isinstance(skeleton, (list, tuple)):
+        return [_fill_blocks(value, subs) for value in skeleton]
+    return skeleton
+
+# SSL context built once at import - verifies against the corporate CA bundle when set,
+# otherwise certifi's bundle; SLACK_INSECURE_TLS=1 disables verification as a last resort
+_SSL_CTX = ssl.create_default_context(cafile=os.getenv("CORPORATE_CA_BUNDLE") or certifi.where())
+if os.getenv("SLACK_INSECURE_TLS") == "1":
+    _SSL_CTX.check_hostname = False
+    _SSL_CTX.verify_mode = ssl.CERT_NONE
+
+# One keep-alive HTTP session shared by all Slack posts, bound to the loop that created it
+_SHARED_SESSION: Optional[aiohttp.ClientSession] = None
+_SHARED_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the shared Slack HTTP session, creating it on first use in the running loop"""
+    global _SHARED_SESSION, _SHARED_SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _SHARED_SESSION is None or _SHARED_SESSION.closed or _SHARED_SESSION_LOOP is not loop:
+        await close_shared_session()
+        connector = aiohttp.TCPConnector(ssl=_SSL_CTX, limit=100, keepalive_timeout=30)
+        _SHARED_SESSION = aiohttp.ClientSession(connector=connector)
+        _SHARED_SESSION_LOOP = loop
+    return _SHARED_SESSION
+
+async def close_shared_session():
+    """Close the shared Slack HTTP session - call from the workflow teardown"""
+    global _SHARED_SESSION, _SHARED_SESSION_LOOP
+    session, _SHARED_SESSION, _SHARED_SESSION_LOOP = _SHARED_SESSION, None, None
+    if session is not None and not session.closed:
+        try:
+            await session.close()
+        except Exception as e:
+            # A session left over from an earlier, already closed loop cannot close cleanly
+            logger.debug("Error closing Slack HTTP session (ignored): %s", e)
 
 class SlackIntegration:
     """
@@ -24,16 +156,21 @@ class SlackIntegration:
         # Prefer bot token + channel for accuracy, fallback to webhook
         if self.bot_token and self.channel_id:
             self.use_bot_api = True
-            print(f"🔗 Using Slack bot API with channel: {self.channel_id}")
+            logger.info("🔗 Using Slack bot API with channel: %s", self.channel_id)
         elif self.webhook_url:
             self.use_bot_api = False
-            print("🔗 Using Slack webhook (may not target specific channel)")
+            logger.info("🔗 Using Slack webhook (may not target specific channel)")
         else:
             raise ValueError(
                 "Slack configuration missing. Please set either:\n"
                 "- SLACK_BOT_TOKEN + SLACK_CHANNEL_ID (recommended)\n"
                 "- SLACK_WEBHOOK_URL (fallback)"
             )
+        
+        # Batched notifications, created lazily on (and bound to) the running loop
+        self._pending = None
+        self._pending_loop = None
+        self._flush_task = None
     
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is valid HTTP/HTTPS URL"""
@@ -46,109 +183,62 @@ class SlackIntegration:
         if not response_text:
             return ""
         
-        import re
         # Look for URLs in various formats from MCP responses
-        # Pattern for Confluence/GitHub URLs
-        url_patterns = [
-            r'https://[^\s\)\]]+(?:\([^\)]*\))?',  # Standard URLs
-            r'\[View Page\]\((https://[^\)]+)\)',   # Markdown link format
-            r'\[.*?\]\((https://[^\)]+)\)',         # Any markdown link
-            r'view and edit the page using the following link[s]?:\s*\[.*?\]\((https://[^\)]+)\)',  # Confluence specific
-        ]
-        
-        for pattern in url_patterns:
-            match = re.search(pattern, response_text, re.IGNORECASE)
-            if match:
-                # Return the full URL or the captured group
-                url = match.group(1) if len(match.groups()) > 0 else match.group(0)
-                if self._is_valid_url(url):
-                    return url
-        
-        return ""
+        match = _URL_ALT.search(response_text)
+        if not match:
+            return ""
+        url = match.group("vp") or match.group("md") or match.group("bare")
+        return url if self._is_valid_url(url) else ""
 
     async def send_workflow_completion(self, 
                                      project_name: str,
                                      transcript_file: str,
                                      pr_url: str = None,
                                      confluence_folder_url: str = None,
-                                     summary: str = "") -> Dict[str, Any]:
-        """Send workflow completion notification to Slack"""
+                                     summary: str = "",
+                                     batch: bool = False) -> Dict[str, Any]:
+        """Send workflow completion notification to Slack
+        
+        With batch=True the notification is queued and coalesced with other completions
+        arriving within a short window into a single Slack post.
+        """
         # Extract real URLs from MCP response text if needed
         if pr_url and not self._is_valid_url(pr_url):
             extracted_pr_url = self._extract_url_from_mcp_response(pr_url)
             if extracted_pr_url:
                 pr_url = extracted_pr_url
-                print(f"🔗 Extracted PR URL: {pr_url}")
+                logger.debug("🔗 Extracted PR URL: %s", pr_url)
             else:
                 pr_url = None  # Invalid URL, don't include button
-                print(f"⚠️ Invalid PR URL, skipping button: {pr_url}")
+                logger.warning("⚠️ Invalid PR URL, skipping button: %s", pr_url)
 
         if confluence_folder_url and not self._is_valid_url(confluence_folder_url):
             extracted_confluence_url = self._extract_url_from_mcp_response(confluence_folder_url)
             if extracted_confluence_url:
                 confluence_folder_url = extracted_confluence_url
-                print(f"🔗 Extracted Confluence URL: {confluence_folder_url}")
+                logger.debug("🔗 Extracted Confluence URL: %s", confluence_folder_url)
             else:
                 confluence_folder_url = None  # Invalid URL, don't include button
-                print(f"⚠️ Invalid Confluence URL, skipping button: {confluence_folder_url}")
+                logger.warning("⚠️ Invalid Confluence URL, skipping button: %s", confluence_folder_url)
 
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"🤖 AI Employee Completed: {project_name}"
-                }
-            },
-            {
-                "type": "section",
-                "fields": [
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Project:*\n{project_name}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Transcript:*\n{transcript_file}"
-                    },
-                    {
-                        "type": "mrkdwn",
-                        "text": f"*Completed:*\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                    }
-                ]
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*Summary:*\n{summary or 'The AI agent has successfully completed the task outlined in the meeting transcript.'}"
-                }
-            }
-        ]
+        subs = {
+            "project_name": project_name,
+            "transcript_file": transcript_file,
+            "completed": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "summary": summary or 'The AI agent has successfully completed the task outlined in the meeting transcript.',
+            "pr_url": pr_url,
+            "confluence_folder_url": confluence_folder_url
+        }
+        blocks = _fill_blocks(_BLOCKS_SKELETON, subs)
         
         # Add action buttons only for valid URLs
         valid_actions = []
         
         if pr_url and self._is_valid_url(pr_url):
-            valid_actions.append({
-                "type": "button",
-                "text": {
-                    "type": "plain_text",
-                    "text": "📥 Review Pull Request"
-                },
-                "url": pr_url,
-                "style": "primary"
-            })
+            valid_actions.append(_fill_blocks(_PR_BUTTON_SKELETON, subs))
         
         if confluence_folder_url and self._is_valid_url(confluence_folder_url):
-            valid_actions.append({
-                "type": "button",
-                "text": {
-                    "type": "plain_text",
-                    "text": "📚 View Documentation"
-                },
-                "url": confluence_folder_url
-            })
+            valid_actions.append(_fill_blocks(_DOCS_BUTTON_SKELETON, subs))
         
         # Only add actions block if we have valid URLs
         if valid_actions:
@@ -156,26 +246,99 @@ class SlackIntegration:
                 "type": "actions",
                 "elements": valid_actions
             })
-            print(f"✅ Added {len(valid_actions)} action buttons with valid URLs")
+            logger.debug("✅ Added %d action buttons with valid URLs", len(valid_actions))
         else:
-            print("ℹ️ No valid URLs provided, skipping action buttons")
+            logger.debug("ℹ️ No valid URLs provided, skipping action buttons")
         
-        # Add footer
-        blocks.append({
-            "type": "context",
-            "elements": [
-                {
-                    "type": "mrkdwn",
-                    "text": "🚀 Generated by AI Employee Workflow System"
-                }
-            ]
-        })
+        if batch:
+            return await self._enqueue_blocks(blocks)
         
+        # Add footer (static, shared between messages)
+        return await self._send_blocks(blocks + [_FOOTER_BLOCK])
+    
+    async def _send_blocks(self, blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send one message through the configured Slack transport"""
         if self.use_bot_api:
             return await self._post_message(blocks=blocks)
         else:
             return await self._post_webhook(blocks=blocks)
     
+    async def _enqueue_blocks(self, blocks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Queue a notification for the batching flush task and wait for its post result"""
+        loop = asyncio.get_running_loop()
+        if self._pending is None or self._pending_loop is not loop:
+            # Each asyncio.run() gets a new loop; the old queue and task died with the previous one
+            self._pending = asyncio.Queue()
+            self._pending_loop = loop
+            self._flush_task = None
+        result = loop.create_future()
+        self._pending.put_nowait((blocks, result))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        return await result
+    
+    async def _flush_loop(self):
+        """Coalesce queued notifications arriving within the batch window into single posts"""
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while not self._pending.empty():
+                batch = [self._pending.get_nowait()]
+                deadline = loop.time() + _BATCH_WINDOW_SECONDS
+                while len(batch) < _MAX_BATCH:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._pending.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+                await self._flush_batch(batch)
+                batch = []
+        except BaseException as e:
+            # Don't leave the callers of unposted notifications waiting forever
+            while not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            for _, result in batch:
+                if not result.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        result.cancel()
+                    else:
+                        result.set_exception(e)
+            raise
+        finally:
+            # The next enqueue starts a fresh task
+            if self._flush_task is asyncio.current_task():
+                self._flush_task = None
+    
+    async def _flush_batch(self, batch: List[Any]):
+        """Post a batch as few messages as Slack's per-message block limit allows"""
+        message_blocks, waiters = [], []
+        for blocks, result in batch:
+            if waiters and len(message_blocks) + len(blocks) + 2 > _MAX_BLOCKS_PER_MESSAGE:
+                await self._post_batch_message(message_blocks, waiters)
+                message_blocks, waiters = [], []
+            if waiters:
+                message_blocks.append(_DIVIDER_BLOCK)
+            message_blocks.extend(blocks)
+            waiters.append(result)
+        await self._post_batch_message(message_blocks, waiters)
+    
+    async def _post_batch_message(self, blocks: List[Dict[str, Any]], waiters: List[asyncio.Future]):
+        """Send one coalesced message and hand its result to every waiting caller"""
+        try:
+            result = await self._send_blocks(blocks + [_FOOTER_BLOCK])
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": str(e),
+                "message": f"Failed to send Slack message: {str(e)}"
+            }
+        result = {**result, "batched_notifications": len(waiters)}
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(result)
+    
     async def _post_message(self, text: str = None, blocks: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Post message to Slack channel"""
         
@@ -195,36 +358,29 @@ class SlackIntegration:
         api_base = "https://slack.com/api"
         
         try:
-            # Create SSL context that ignores certificate verification for corporate networks
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.post(
-                    f"{api_base}/chat.postMessage",
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    
-                    result = await response.json()
+            session = await _get_session()
+            async with session.post(
+                f"{api_base}/chat.postMessage",
+                data=orjson.dumps(payload),
+                headers=headers
+            ) as response:
+                
+                result = orjson.loads(await response.read())
+                
+                if result.get("ok"):
+                    return {
+                        "success": True,
+                        "message": "Slack message sent successfully",
+                        "channel": self.channel_id,
+                        "timestamp": result.get("ts")
+                    }
+                else:
+                    return {
+                        "success": False,
+                        "error": result.get("error", "Unknown error"),
+                        "message": f"Failed to send Slack message: {result.get('error')}"
+                    }
                     
-                    if result.get("ok"):
-                        return {
-                            "success": True,
-                            "message": "Slack message sent successfully",
-                            "channel": self.channel_id,
-                            "timestamp": result.get("ts")
-                        }
-                    else:
-                        return {
-                            "success": False,
-                            "error": result.get("error", "Unknown error"),
-                            "message": f"Failed to send Slack message: {result.get('error')}"
-                        }
-                        
         except Exception as e:
             return {
                 "success": False,
@@ -241,33 +397,27 @@ class SlackIntegration:
         }
         
         try:
-            # Create SSL context for corporate networks
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.post(
-                    self.webhook_url,
-                    json=payload
-                ) as response:
+            session = await _get_session()
+            async with session.post(
+                self.webhook_url,
+                data=orjson.dumps(payload),
+                headers=_JSON_HEADERS
+            ) as response:
+                
+                if response.status == 200:
+                    return {
+                        "success": True,
+                        "message": "Slack webhook message sent successfully",
+                        "channel": "webhook-channel"
+                    }
+                else:
+                    error_text = await response.text()
+                    return {
+                        "success": False,
+                        "error": f"HTTP {response.status}",
+                        "message": f"Failed to send webhook message: {error_text}"
+                    }
                     
-                    if response.status == 200:
-                        return {
-                            "success": True,
-                            "message": "Slack webhook message sent successfully",
-                            "channel": "webhook-channel"
-                        }
-                    else:
-                        error_text = await response.text()
-                        return {
-                            "success": False,
-                            "error": f"HTTP {response.status}",
-                            "message": f"Failed to send webhook message: {error_text}"
-                        }
-                        
         except Exception as e:
             return {
                 "success": False,
@@ -279,10 +429,10 @@ class SlackIntegration:
 try:
     slack_integration = SlackIntegration()
 except Exception as e:
-    print(f"❌ Warning: Could not initialize Slack integration: {str(e)}")
+    logger.warning("❌ Warning: Could not initialize Slack integration: %s", e)
     # Create a dummy Slack integration for testing
     class DummySlackIntegration:
-        async def send_workflow_completion(self, project_name, transcript_file, pr_url=None, confluence_folder_url=None, summary=""):
+        async def send_workflow_completion(self, project_name, transcript_file, pr_url=None, confluence_folder_url=None, summary="", batch=False):
             return {"success": False, "error": "Slack integration not initialized", "message": "Slack integration not configured"}
     
     slack_integration = DummySlackIntegration()
@@ -1,18 +1,223 @@
 # RAG (Retrieval-Augmented Generation) system for Linux-to-Windows API conversion knowledge
 
 import os
+import re
+import copy
+import json
+import time
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
 import chromadb
-from typing import List, Dict, Any, Optional
+import numpy as np
+from chromadb.errors import ChromaError
+from openai import OpenAIError
+from rank_bm25 import BM25Okapi
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
-from dotenv import load_dotenv
+from src.utils.ai_client import get_ai_client
+from src.utils.env import load_env_once
 
 # Load environment variables
-load_dotenv()
+load_env_once()
+
+# Failures of the embeddings request or of a search against malformed vectors; anything
+# else (KeyboardInterrupt, MemoryError, programming errors) propagates
+_QUERY_ERRORS = (OpenAIError, ValueError, KeyError, IndexError)
+
+# Lexical tokens for BM25 - API names such as "open()" or "pthread_create" survive intact
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+# Hybrid ranking weights (BM25 and cosine, each normalized to [0, 1])
+_BM25_WEIGHT = 0.4
+_COSINE_WEIGHT = 0.6
+
+# A lexical answer must also beat the runner-up BM25 score by this factor
+_BM25_MARGIN = 2.0
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+@lru_cache(maxsize=1)
+def _get_embedder():
+    """Embeddings model shared by every RAG system instance, created on first use"""
+    return get_ai_client().get_embeddings_model()
+
+class FlatNumpyIndex:
+    """
+    In-memory cosine-similarity index for a small knowledge base.
+
+    Vectors are kept L2-normalized in one contiguous float32 (N, D) matrix, with ids,
+    documents and metadatas in parallel lists, so a search is a single matrix-vector
+    product followed by a partial sort.
+
+    With quantize=True an int8 copy of the matrix (symmetric, per-dimension scale) is
+    scanned first and only the best rerank_k rows are rescored on the float32 vectors,
+    which keeps large knowledge bases cheap to search.
+    """
+
+    def __init__(self, quantize: bool = True, rerank_k: int = 64):
+        self.M: Optional[np.ndarray] = None
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self._cat_index: Dict[str, List[int]] = {}
+        self._cat_rows: Dict[str, np.ndarray] = {}
+
+        self.quantize = quantize
+        self.rerank_k = rerank_k
+        self.M_q: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @staticmethod
+    def _top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first
+
+        Partitioning selects the k survivors in O(N) without negating (copying) the
+        whole score vector; only those k are sorted.
+        """
+        if k < len(scores):
+            rows = np.argpartition(scores, -k)[-k:]
+        else:
+            rows = np.arange(len(scores))
+        return rows[np.argsort(-scores[rows])]
+
+    def _quantize_rows(self):
+        """Rebuild the int8 codes: M ~= M_q * scale, with one scale per dimension"""
+        scale = np.abs(self.M).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+        self.scale = scale.astype(np.float32)
+        self.M_q = np.ascontiguousarray(np.round(self.M / self.scale).astype(np.int8))
+
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: Any):
+        """Append rows to the index"""
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        self.M = np.ascontiguousarray(vectors if self.M is None else np.vstack((self.M, vectors)))
+        self.ids.extend(ids)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+        if self.quantize:
+            self._quantize_rows()
+
+        self._index_categories(len(self.ids) - len(ids))
+
+    def _index_categories(self, first_row: int = 0):
+        """Record category -> row indices for rows from first_row on"""
+        # Category filters restrict the search to precomputed row indices
+        for row, metadata in enumerate(self.metadatas[first_row:], first_row):
+            self._cat_index.setdefault((metadata or {}).get("category"), []).append(row)
+        self._cat_rows = {category: np.asarray(rows, dtype=np.intp) for category, rows in self._cat_index.items()}
+
+    def category_rows(self, category: str) -> Optional[np.ndarray]:
+        """Row indices of a category, or None when no row has it"""
+        return self._cat_rows.get(category)
+
+    def scores_for(self, query_embedding: Any, rows: List[int]) -> np.ndarray:
+        """Exact cosine similarity of the query to the given rows"""
+        return self.M[rows] @ self._normalize(np.asarray(query_embedding, dtype=np.float32))
+
+    def save(self, path_prefix: str, info: Dict[str, Any] = None):
+        """Write the index to <prefix>.vectors.npy (+ .codes.npy/.scale.npy) and a <prefix>.meta.jsonl sidecar
+
+        Every file is written to a temporary name and renamed into place; the sidecar goes
+        last and records the row count, so a partial write is detected on load.
+        """
+        for suffix, array in ((".vectors.npy", self.M), (".codes.npy", self.M_q), (".scale.npy", self.scale)):
+            if array is None:
+                continue
+            tmp_path = f"{path_prefix}{suffix}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path_prefix + suffix)
+
+        tmp_path = f"{path_prefix}.meta.jsonl.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"rows": len(self.ids), "info": info or {}}) + "\n")
+            for row in zip(self.ids, self.documents, self.metadatas):
+                f.write(json.dumps(row) + "\n")
+        os.replace(tmp_path, path_prefix + ".meta.jsonl")
+
+    @classmethod
+    def load(cls, path_prefix: str, quantize: bool = True, rerank_k: int = 64) -> Tuple["FlatNumpyIndex", Dict[str, Any]]:
+        """Load an index written by save(), memory-mapping the matrices read-only
+
+        Returns the index and the info dict passed to save(). Raises OSError or ValueError
+        when the files are missing or inconsistent.
+        """
+        with open(path_prefix + ".meta.jsonl", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            rows = [json.loads(line) for line in f]
+
+        index = cls(quantize=quantize, rerank_k=rerank_k)
+        index.M = np.load(path_prefix + ".vectors.npy", mmap_mode="r")
+        if not header["rows"] == len(rows) == index.M.shape[0]:
+            raise ValueError(f"Index files at {path_prefix} are inconsistent")
+        for row_id, document, metadata in rows:
+            index.ids.append(row_id)
+            index.documents.append(document)
+            index.metadatas.append(metadata)
+
+        if quantize:
+            try:
+                index.M_q = np.load(path_prefix + ".codes.npy", mmap_mode="r")
+                index.scale = np.load(path_prefix + ".scale.npy")
+            except OSError:
+                index.M_q = None
+            if index.M_q is None or index.M_q.shape != index.M.shape:
+                index._quantize_rows()
+
+        index._index_categories()
+        return index, header.get("info", {})
+
+    def search(self, query_embedding: Any, top_k: int, category: str = None) -> List[Tuple[int, float]]:
+        """Return (row, cosine similarity) pairs for the top_k rows, best first"""
+        if not self.ids or top_k <= 0:
+            return []
+
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32))
+        matrix, codes, rows = self.M, self.M_q, None
+        if category:
+            rows = self._cat_rows.get(category)
+            if rows is None:
+                return []
+            matrix = matrix[rows]
+            codes = codes[rows] if codes is not None else None
+        k = min(top_k, len(matrix))
+
+        if codes is not None and len(matrix) > max(self.rerank_k, k):
+            # Coarse int8 scan: x.q ~= M_q.(scale*q), with the weighted query quantized as well
+            weighted = self.scale * query
+            peak = float(np.abs(weighted).max()) or 1.0
+            query_q = np.round(weighted * (127.0 / peak)).astype(np.int8)
+            approx = np.einsum("ij,j->i", codes, query_q, dtype=np.int32)
+
+            # Exact rerank of the best candidates on the float32 vectors
+            pool = self._top_rows(approx, max(self.rerank_k, k))
+            scores = matrix[pool] @ query
+            hits = [(pool[i], scores[i]) for i in self._top_rows(scores, k)]
+        else:
+            scores = matrix @ query
+            hits = [(i, scores[i]) for i in self._top_rows(scores, k)]
+
+        # Map submatrix positions back to index rows
+        if rows is not None:
+            hits = [(rows[i], score) for i, score in hits]
+        return [(int(row), float(score)) for row, score in hits]
 
 class LinuxWindowsRAGSystem:
     """
     RAG system specifically designed for Linux-to-Windows API conversion knowledge.
-    Uses ChromaDB for vector storage and simple text matching for demo purposes.
+    Uses ChromaDB to persist the vectors and an in-memory NumPy index to search them.
 
     This system stores knowledge about:
     - Linux system calls and their Windows equivalents
@@ -21,31 +226,107 @@ class LinuxWindowsRAGSystem:
     - Common pitfalls and solutions
     """
 
-    def __init__(self, db_path: str = None, collection_name: str = "linux_windows_conversion"):
+    def __init__(self, db_path: str = None, collection_name: str = "linux_windows_conversion",
+                 cache_max_size: int = 2000, cache_ttl: float = 300.0, bm25_threshold: float = 2.0):
         self.db_path = db_path or os.getenv("CHROMA_DB_PATH", "./data/chroma_db")
         self.collection_name = collection_name
 
+        # Queries whose best BM25 score reaches this (and clearly beats the runner-up) are
+        # answered lexically, without an embeddings request
+        self.bm25_threshold = bm25_threshold
+
+        # Query result cache (LRU with TTL) - repeated queries skip embedding and search
+        self._cache = collections.OrderedDict()
+        self._cache_lock = threading.RLock()
+        self._cache_max_size = cache_max_size
+        self._cache_ttl = cache_ttl
+        self._cache_hits = 0
+        self._cache_misses = 0
+
         # Ensure database directory exists
         Path(self.db_path).mkdir(parents=True, exist_ok=True)
 
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(path=self.db_path)
 
-        # Get or create collection
-        try:
-            self.collection = self.client.get_collection(name=self.collection_name)
-            print(f"✅ Loaded existing collection '{self.collection_name}'")
-        except Exception:
-            # Collection doesn't exist, create it
-            self.collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"description": "Linux to Windows API conversion knowledge base"}
-            )
+        # Documents and queries are embedded explicitly with the configured embeddings model,
+        # so collections are opened without Chroma's default (ONNX) embedding function
+        self.embedder = _get_embedder()
+        self.embedding_model = get_ai_client().embedding_model_name
+
+        # Open the existing collection if it was embedded with our model, else (re)create it
+        self.collection = self._open_collection()
+
+        populated = self.collection.count() == 0
+        if populated:
+            # New (or empty) collection - populate with initial knowledge
             print(f"✅ Created new collection '{self.collection_name}'")
-            # Populate with initial knowledge
             self._populate_initial_knowledge()
+        else:
+            print(f"✅ Loaded existing collection '{self.collection_name}'")
+
+        # Queries are served from an in-memory index memory-mapped from .npy files next to
+        # the Chroma database, which remains the source of truth
+        self._load_index(rebuild=populated)
+
+    def _open_collection(self):
+        """Open the knowledge base collection, rebuilding it if it was embedded with another model
+
+        The stored metadata is read before anything is created, since creating or updating
+        the collection would record the current model and hide a mismatch.
+        """
+        try:
+            collection = self.client.get_collection(name=self.collection_name, embedding_function=None)
+        except (ValueError, ChromaError):
+            # Does not exist yet
+            collection = None
+
+        if collection is not None:
+            if (collection.metadata or {}).get("embedding_model") == self.embedding_model:
+                return collection
+            # Vectors from another embedding model cannot be queried with ours - rebuild
+            print(f"⚠️ Collection '{self.collection_name}' was embedded with another model, rebuilding")
+            self.client.delete_collection(name=self.collection_name)
+
+        return self.client.create_collection(
+            name=self.collection_name,
+            embedding_function=None,
+            metadata={
+                "description": "Linux to Windows API conversion knowledge base",
+                "embedding_model": self.embedding_model
+            }
+        )
+
+    def _load_index(self, rebuild: bool = False):
+        """Load the in-memory index from its .npy files, rebuilding them from the collection if stale"""
+        path_prefix = str(Path(self.db_path) / f"{self.collection_name}.kb")
+
+        if not rebuild:
+            try:
+                index, info = FlatNumpyIndex.load(path_prefix)
+                if info.get("embedding_model") == self.embedding_model and len(index) == self.collection.count():
+                    self._set_index(index)
+                    return
+            except (OSError, ValueError, KeyError):
+                pass
 
-    def _populate_initial_knowledge(self):
+        data = self.collection.get(include=["documents", "metadatas", "embeddings"])
+        index = FlatNumpyIndex()
+        if data["ids"]:
+            index.add(data["ids"], data["documents"], data["metadatas"], data["embeddings"])
+            try:
+                index.save(path_prefix, {"embedding_model": self.embedding_model})
+            except OSError as e:
+                print(f"⚠️ Could not persist knowledge index: {str(e)}")
+        self._set_index(index)
+
+    def _set_index(self, index: FlatNumpyIndex):
+        """Serve queries from a new index, with a BM25 index over the same documents"""
+        self.index = index
+        self._bm25 = BM25Okapi([_tokenize(document) for document in index.documents]) if len(index) else None
+        self._invalidate_cache()
+
+    def _populate_initial_knowledge(self, batch_size: int = 100, max_workers: int = 4):
         """Populate the knowledge base with initial Linux-to-Windows conversion knowledge"""
         initial_knowledge = [
             {
@@ -92,81 +373,261 @@ class LinuxWindowsRAGSystem:
             }
         ]
 
-        # Add documents to collection (without embeddings for simplicity)
-        documents = [item["content"] for item in initial_knowledge]
-        metadatas = [{k: v for k, v in item.items() if k != "content"} for item in initial_knowledge]
-        ids = [item["id"] for item in initial_knowledge]
+        # Add documents to collection in batches, embedding each batch with one request
+        documents, metadatas, ids = [], [], []
+        for item in initial_knowledge:
+            metadata = dict(item)
+            documents.append(metadata.pop("content"))
+            metadatas.append(metadata)
+            ids.append(item["id"])
 
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        self._add_documents(ids, documents, metadatas, batch_size, max_workers)
 
+        self._invalidate_cache()
         print(f"✅ Populated knowledge base with {len(initial_knowledge)} initial conversion examples")
 
+    def _add_documents(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]],
+                       batch_size: int = 100, max_workers: int = 4):
+        """Embed and insert documents in batches, overlapping embedding requests with inserts
+
+        Batches are embedded on worker threads (at most max_workers in flight, which also
+        bounds memory) and inserted into Chroma in order on the calling thread.
+        """
+        def insert(batch_slice: slice, embedding_future):
+            # Hand Chroma one contiguous float32 array rather than nested Python lists
+            embeddings = np.ascontiguousarray(embedding_future.result(), dtype=np.float32)
+            self.collection.add(
+                documents=documents[batch_slice],
+                metadatas=metadatas[batch_slice],
+                ids=ids[batch_slice],
+                embeddings=embeddings
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = collections.deque()
+            for i in range(0, len(ids), batch_size):
+                if len(in_flight) >= max_workers:
+                    insert(*in_flight.popleft())
+                batch_slice = slice(i, i + batch_size)
+                in_flight.append((batch_slice, executor.submit(self.embedder.embed_documents, documents[batch_slice])))
+            while in_flight:
+                insert(*in_flight.popleft())
+
+    def _invalidate_cache(self):
+        """Drop all cached query results (call whenever the collection changes)"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get query cache statistics"""
+        with self._cache_lock:
+            total = self._cache_hits + self._cache_misses
+            return {
+                "size": len(self._cache),
+                "max_size": self._cache_max_size,
+                "ttl_seconds": self._cache_ttl,
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_rate": self._cache_hits / total if total else 0.0
+            }
+
+    def _cache_get(self, cache_key: Tuple[Any, ...]) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of a fresh cached query result (counting the hit or miss), or None
+
+        Callers own the returned dicts, so mutating them cannot corrupt later hits.
+        """
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] <= self._cache_ttl:
+                self._cache.move_to_end(cache_key)
+                self._cache_hits += 1
+                return copy.deepcopy(cached[1])
+            self._cache_misses += 1
+        return None
+
+    def _cache_put(self, cache_key: Tuple[Any, ...], results: List[Dict[str, Any]]):
+        """Store a copy of a query result, evicting the least recently used entries over the size limit"""
+        results = copy.deepcopy(results)
+        with self._cache_lock:
+            self._cache[cache_key] = (time.monotonic(), results)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self._cache_max_size:
+                self._cache.popitem(last=False)
+
     def query_knowledge(self, query: str, top_k: int = 5, category_filter: str = None) -> List[Dict[str, Any]]:
         """Query the knowledge base for relevant information"""
+        # The argument tuple itself is the key - no formatted string, encoding or digest per call
+        cache_key = (query, top_k, category_filter)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Simple query using ChromaDB's built-in similarity
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=top_k,
-                where={"category": category_filter} if category_filter else None
-            )
+            hits = self._hybrid_search(query, top_k, category_filter)
 
             # Format results
-            formatted_results = []
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    "id": results['ids'][0][i],
-                    "content": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i],
-                    "similarity_score": 1 - results['distances'][0][i] if results['distances'] else 0.5
-                })
-
+            formatted_results = self._format_hits(hits)
+            self._cache_put(cache_key, formatted_results)
             return formatted_results
 
-        except Exception as e:
+        except _QUERY_ERRORS as e:
             print(f"❌ Error querying knowledge: {str(e)}")
             # Return empty results on error
             return []
 
-    def get_conversion_suggestions(self, linux_code: str, context: str = "") -> List[Dict[str, Any]]:
-        """Get Windows conversion suggestions for Linux code"""
-        # Create a comprehensive query
-        query = f"Convert Linux code to Windows: {linux_code}"
+    def _hybrid_search(self, query: str, top_k: int, category_filter: str = None) -> List[Tuple[int, float]]:
+        """Rank rows by BM25 and cosine similarity
+
+        A confident lexical match (e.g. an exact API name that only one document mentions)
+        is returned from BM25 alone and skips the embeddings request; otherwise cosine candidates and the BM25 top rows are
+        merged with 0.4 * BM25 + 0.6 * cosine.
+        """
+        hits, lexical_state = self._lexical_search(query, top_k, category_filter)
+        if hits is not None:
+            return hits
+        # Embed the query with the same model as the stored documents
+        return self._blend_search(self.embedder.embed_query(query), top_k, category_filter, lexical_state)
+
+    def _lexical_search(self, query: str, top_k: int, category_filter: str = None) -> Tuple[Optional[List[Tuple[int, float]]], Any]:
+        """BM25 stage of the hybrid ranking
+
+        Returns (hits, None) when BM25 alone settles the query, otherwise (None, state) where
+        state is what _blend_search needs to merge the cosine scores in.
+        """
+        tokens = _tokenize(query)
+        if self._bm25 is None or not tokens or top_k <= 0:
+            return None, None
+
+        bm25 = self._bm25.get_scores(tokens)
+        rows = np.arange(len(bm25))
+        if category_filter:
+            rows = self.index.category_rows(category_filter)
+            if rows is None:
+                return [], None
+        bm25_peak = float(bm25[rows].max())
+        bm25_norm = bm25 / bm25_peak if bm25_peak > 0 else np.zeros_like(bm25)
+
+        ranked = rows[np.argsort(-bm25[rows], kind="stable")]
+        lexical = ranked[:top_k]
+        runner_up = float(bm25[ranked[1]]) if len(ranked) > 1 else 0.0
+        if bm25_peak >= self.bm25_threshold and bm25_peak >= _BM25_MARGIN * runner_up:
+            return [(int(row), float(bm25_norm[row])) for row in lexical], None
+        return None, (bm25_norm, lexical)
+
+    def _blend_search(self, query_embedding: Any, top_k: int, category_filter: str = None,
+                      lexical_state: Any = None) -> List[Tuple[int, float]]:
+        """Cosine stage of the hybrid ranking, merged with the BM25 scores when there are any"""
+        if lexical_state is None:
+            return self.index.search(query_embedding, top_k, category_filter)
+
+        bm25_norm, lexical = lexical_state
+        candidates = {row for row, _ in self.index.search(query_embedding, top_k * 4, category_filter)}
+        candidates.update(int(row) for row in lexical)
+        candidates = sorted(candidates)
+        cosine_norm = (self.index.scores_for(query_embedding, candidates) + 1.0) / 2.0
+        combined = _BM25_WEIGHT * bm25_norm[candidates] + _COSINE_WEIGHT * cosine_norm
+        order = np.argsort(-combined, kind="stable")[:top_k]
+        return [(candidates[i], float(combined[i])) for i in order]
+
+    def _format_hits(self, hits: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        """Turn (row, score) index hits into query result dicts"""
+        return [
+            {
+                "id": self.index.ids[row],
+                "content": self.index.documents[row],
+                "metadata": dict(self.index.metadatas[row] or {}),
+                "similarity_score": score
+            }
+            for row, score in hits
+        ]
+
+    @staticmethod
+    def _conversion_query(linux_code: str, context: str = "") -> str:
+        """Build the knowledge base query for converting a Linux code snippet"""
         if context:
-            query += f" Context: {context}"
+            return f"Convert Linux code to Windows: {linux_code} Context: {context}"
+        return f"Convert Linux code to Windows: {linux_code}"
+
+    @staticmethod
+    def _to_suggestion(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a query result into a conversion suggestion"""
+        metadata = result['metadata']
+        return {
+            "linux_api": metadata.get('linux_api', 'Unknown'),
+            "windows_api": metadata.get('windows_api', 'Unknown'),
+            "category": metadata.get('category', 'general'),
+            "conversion_example": result['content'],
+            "confidence": result['similarity_score'],
+            "source_id": result['id']
+        }
 
-        # Query knowledge base
-        results = self.query_knowledge(query, top_k=3)
+    def get_conversion_suggestions(self, linux_code: str, context: str = "") -> List[Dict[str, Any]]:
+        """Get Windows conversion suggestions for Linux code"""
+        # Query knowledge base with a comprehensive query
+        results = self.query_knowledge(self._conversion_query(linux_code, context), top_k=3)
 
         # Enhance results with specific suggestions
-        suggestions = []
-        for result in results:
-            suggestion = {
-                "linux_api": result['metadata'].get('linux_api', 'Unknown'),
-                "windows_api": result['metadata'].get('windows_api', 'Unknown'),
-                "category": result['metadata'].get('category', 'general'),
-                "conversion_example": result['content'],
-                "confidence": result['similarity_score'],
-                "source_id": result['id']
-            }
-            suggestions.append(suggestion)
+        return [self._to_suggestion(result) for result in results]
 
-        return suggestions
+    def get_conversion_suggestions_batch(self, snippets: List[str], context: str = "") -> List[List[Dict[str, Any]]]:
+        """Get Windows conversion suggestions for several Linux code snippets at once
 
-    def get_collection_stats(self) -> Dict[str, Any]:
-        """Get statistics about the knowledge base collection"""
+        Ranks and caches exactly like get_conversion_suggestions; only the queries that
+        still need an embedding after the cache and BM25 stages share one embeddings request.
+        """
+        if not snippets:
+            return []
+
+        try:
+            results: List[Optional[List[Dict[str, Any]]]] = [None] * len(snippets)
+            pending = []
+            for i, snippet in enumerate(snippets):
+                query = self._conversion_query(snippet, context)
+                cache_key = (query, 3, None)
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    results[i] = cached
+                    continue
+                hits, lexical_state = self._lexical_search(query, 3)
+                if hits is not None:
+                    results[i] = self._format_hits(hits)
+                    self._cache_put(cache_key, results[i])
+                else:
+                    pending.append((i, query, cache_key, lexical_state))
+
+            if pending:
+                embeddings = self.embedder.embed_documents([query for _, query, _, _ in pending])
+                for (i, _, cache_key, lexical_state), embedding in zip(pending, embeddings):
+                    results[i] = self._format_hits(self._blend_search(embedding, 3, None, lexical_state))
+                    self._cache_put(cache_key, results[i])
+
+            return [[self._to_suggestion(result) for result in hits] for hits in results]
+
+        except _QUERY_ERRORS as e:
+            print(f"❌ Error getting batch conversion suggestions: {str(e)}")
+            return [[] for _ in snippets]
+
+    def get_collection_stats(self, quick: bool = False) -> Dict[str, Any]:
+        """Get statistics about the knowledge base collection
+
+        With quick=True only the document count is returned, which is a single
+        COUNT query instead of reading every metadata row.
+        """
         try:
-            collection_data = self.collection.get()
+            if quick:
+                return {
+                    "total_documents": self.collection.count(),
+                    "collection_name": self.collection_name,
+                    "db_path": self.db_path
+                }
+
+            # Only metadata is needed - skip loading documents and embeddings
+            collection_data = self.collection.get(include=['metadatas'])
 
             # Count by category
-            categories = {}
-            for metadata in collection_data['metadatas']:
-                category = metadata.get('category', 'uncategorized')
-                categories[category] = categories.get(category, 0) + 1
+            categories = collections.Counter(
+                metadata.get('category', 'uncategorized') for metadata in collection_data['metadatas']
+            )
 
             return {
                 "total_documents": len(collection_data['ids']),
@@ -175,22 +636,28 @@ class LinuxWindowsRAGSystem:
                 "db_path": self.db_path
             }
 
-        except Exception as e:
+        except (ChromaError, KeyError) as e:
             print(f"❌ Error getting collection stats: {str(e)}")
             return {"error": str(e)}
 
-# Global RAG system instance - initialized safely
-try:
-    rag_system = LinuxWindowsRAGSystem()
-except Exception as e:
-    print(f"❌ Warning: Could not initialize RAG system: {str(e)}")
-    # Create a dummy RAG system for testing
-    class DummyRAGSystem:
-        def query_knowledge(self, query, top_k=5, category_filter=None):
-            return []
-        def get_conversion_suggestions(self, linux_code, context=""):
-            return []
-        def get_collection_stats(self):
-            return {"total_documents": 0, "categories": {}, "error": "RAG system not initialized"}
+class DummyRAGSystem:
+    """Stand-in used when the RAG system cannot be initialized (e.g. for testing)"""
+    def query_knowledge(self, query, top_k=5, category_filter=None):
+        return []
+    def get_conversion_suggestions(self, linux_code, context=""):
+        return []
+    def get_conversion_suggestions_batch(self, snippets, context=""):
+        return [[] for _ in snippets]
+    def get_collection_stats(self, quick=False):
+        return {"total_documents": 0, "categories": {}, "error": "RAG system not initialized"}
+    def get_cache_stats(self):
+        return {"size": 0, "hits": 0, "misses": 0, "hit_rate": 0.0}
 
-    rag_system = DummyRAGSystem()
+@lru_cache(maxsize=1)
+def get_rag_system():
+    """Global RAG system instance - created (and ChromaDB opened) on first use"""
+    try:
+        return LinuxWindowsRAGSystem()
+    except Exception as e:
+        print(f"❌ Warning: Could not initialize RAG system: {str(e)}")
+        return DummyRAGSystem()
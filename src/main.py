@@ -4,7 +4,7 @@ import os
 import click
 import asyncio
 from pathlib import Path
-from dotenv import load_dotenv
+from src.utils.env import load_env_once
 from src.workflow.orchestrator import WorkflowOrchestrator
 
 # Suppress HuggingFace tokenizers parallelism warnings
@@ -26,7 +26,7 @@ def cli(transcript_path: str, config: str, output_dir: str):
     """
 
     # Load environment variables from .env file
-    load_dotenv()
+    load_env_once()
 
     click.echo(f"🤖 Starting AI Development Workflow")
     click.echo(f"📝 Processing transcript: {transcript_path}")
@@ -39,37 +39,13 @@ def cli(transcript_path: str, config: str, output_dir: str):
     # Initialize and run the workflow orchestrator with improved async cleanup
     orchestrator = WorkflowOrchestrator(config_path=config, output_dir=output_dir)
     
-    # Use controlled event loop management to prevent async cleanup errors
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
+    # asyncio.run cancels leftover tasks, shuts down async generators and closes the loop
     try:
-        # Run the workflow
-        loop.run_until_complete(orchestrator.run_workflow(transcript_path))
+        asyncio.run(orchestrator.run_workflow(transcript_path))
         click.echo("✅ Workflow completed successfully!")
-        
-        # Proper async cleanup to prevent errors
-        click.echo("🔄 Performing async cleanup...")
-        
-        # Cancel any remaining tasks
-        tasks = asyncio.all_tasks(loop)
-        if tasks:
-            click.echo(f"⚠️ Cancelling {len(tasks)} pending tasks...")
-            for task in tasks:
-                task.cancel()
-            # Wait for cancellation to complete
-            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
-        
-        # Shutdown async generators
-        loop.run_until_complete(loop.shutdown_asyncgens())
-        click.echo("✅ Async cleanup completed")
-        
     except Exception as e:
         click.echo(f"❌ Workflow failed: {str(e)}")
         raise
-    finally:
-        # Close the event loop cleanly
-        loop.close()
 
 if __name__ == "__main__":
     cli()
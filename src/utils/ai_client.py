@@ -1,13 +1,14 @@
 # AI Client configuration for Trend Micro RDSec AI Endpoint
 
 import os
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from langchain.chat_models import init_chat_model
 from langchain_openai import OpenAIEmbeddings
-from dotenv import load_dotenv
+from src.utils.env import load_env_once
 
 # Load environment variables
-load_dotenv()
+load_env_once()
 
 class AIClient:
     """
@@ -89,4 +90,7 @@ class AIClient:
         }
 
 # Global AI client instance
-ai_client = AIClient()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_ai_client() -> AIClient:
+    """Get the shared AI client, created (and configuration validated) on first use"""
+    return AIClient()
\ No newline at end of file
@@ -0,0 +1,10 @@
+# Environment loading shared by all modules
+
+from functools import lru_cache
+from dotenv import load_dotenv
+
+@lru_cache(maxsize=1)
+def load_env_once() -> bool:
+    """Parse the .env file once per process - later calls are no-ops"""
+    load_dotenv()
+    return True
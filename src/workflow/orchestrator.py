@@ -1,9 +1,24 @@
 # Sequential workflow orchestrator for single agent execution
 
+import os
+import copy
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from src.agents.workflow_agent import WorkflowAgent
 
+# libyaml-backed loader when available (same safety as safe_load, much faster)
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+@lru_cache(maxsize=16)
+def _load_yaml(path: str, mtime: float) -> dict:
+    """Parse a YAML file once per (path, modification time)"""
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
 class WorkflowOrchestrator:
     """
     Orchestrates the sequential execution of the complete development workflow
@@ -23,8 +38,8 @@ class WorkflowOrchestrator:
     
     def _load_config(self) -> dict:
         """Load configuration from YAML file"""
-        with open(self.config_path, 'r') as f:
-            return yaml.safe_load(f)
+        # Unchanged files come from the parse cache; callers get their own copy to mutate
+        return copy.deepcopy(_load_yaml(self.config_path, os.path.getmtime(self.config_path)))
     
     async def run_workflow(self, transcript_path: str) -> dict:
         """
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Test script to verify if we can eliminate async cleanup errors completely
-using a different approach - custom event loop management
+using asyncio.run to manage the event loop lifecycle
 """
 
 import asyncio
@@ -72,39 +72,12 @@ async def test_with_controlled_loop():
         return False
 
 def main():
-    """Main function with custom event loop management"""
+    """Main function - asyncio.run manages the event loop lifecycle"""
     try:
-        # Create a new event loop for clean slate
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        # Run the test
-        success = loop.run_until_complete(test_with_controlled_loop())
-        
-        # Explicitly shutdown async generators before closing loop
-        print("🔄 Shutting down async generators...")
-        try:
-            # Get all tasks
-            tasks = asyncio.all_tasks(loop)
-            if tasks:
-                print(f"⚠️ Found {len(tasks)} pending tasks, cancelling...")
-                for task in tasks:
-                    task.cancel()
-                
-                # Wait for tasks to complete cancellation
-                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
-            
-            # Shutdown async generators
-            loop.run_until_complete(loop.shutdown_asyncgens())
-            print("✅ Async generators shutdown complete")
-            
-        except Exception as shutdown_error:
-            print(f"⚠️ Shutdown error (ignored): {shutdown_error}")
-        
-        finally:
-            # Close the loop
-            loop.close()
-            print("✅ Event loop closed cleanly")
+        # asyncio.run uses a fresh loop and, on exit, cancels pending tasks, shuts down
+        # async generators and closes the loop
+        success = asyncio.run(test_with_controlled_loop())
+        print("✅ Event loop closed cleanly")
         
         if success:
             print("\n🎉 Test completed successfully with no async errors!")
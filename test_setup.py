@@ -3,131 +3,291 @@
 
 import os
 import sys
-from pathlib import Path
-from dotenv import load_dotenv
+import importlib.util
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
+__all__ = ["test_setup", "run_setup_checks"]
+
+# Environment variables the workflow needs, and the prefix .env.example uses for unset values
+_REQUIRED_VARS = (
+    "OPENAI_API_KEY",
+    "OPENAI_BASE_URL",
+    "CONFLUENCE_BASE_URL",
+    "CONFLUENCE_API_TOKEN",
+    "CONFLUENCE_USER_EMAIL",
+    "CONFLUENCE_SPACE_KEY",
+    "SLACK_BOT_TOKEN",
+    "SLACK_CHANNEL_ID",
+    "GITHUB_TOKEN",
+    "GITHUB_REPO_URL",
+)
+_PLACEHOLDER = "your_"
+_PLACEHOLDER_LEN = len(_PLACEHOLDER)
+
+# Modules the workflow is assembled from, checked by the imports phase
+_MODULES = (
+    ("src.utils.ai_client", "AI client"),
+    ("src.knowledge_base.rag_system", "RAG system"),
+    ("src.workflow.orchestrator", "Workflow orchestrator"),
+)
+
+# Status line templates for the env var report
+_OK = "✅ %s configured"
+_BAD = "❌ %s not configured or using placeholder value"
+
+# Report lines are buffered and written once per phase instead of one print per line
+_out = []
+_emit = _out.append
+
+def _lazy(name, spec=None):
+    """Resolve a module without executing it - the import runs on first attribute access"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if spec is None:
+        spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def _flush():
+    """Write the buffered report lines in a single call"""
+    if not _out:
+        return
+    text = "\n".join(_out) + "\n"
+    _out.clear()
+    # Anything the modules under test printed themselves goes out first
+    sys.stdout.flush()
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is not None and (sys.stdout.encoding or "").lower().replace("-", "") == "utf8":
+        # Encode the whole phase once and skip the text layer
+        buffer.write(text.encode("utf-8"))
+        buffer.flush()
+    else:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+def _open_error(path):
+    """Open and close path once - cheaper than a stat before the real read, and race-free
+
+    Returns None when the file can be opened, otherwise why it cannot.
+    """
+    try:
+        os.close(os.open(path, os.O_RDONLY))
+    except FileNotFoundError:
+        return "not found"
+    except OSError as e:
+        # e.g. PermissionError, or a directory where a file is expected
+        return f"not accessible ({e.strerror})"
+    return None
+
+def _probe(executor, module, call):
+    """Run call() on the executor.
+
+    The module body is executed here on the calling thread (LazyLoader is not thread-safe
+    before Python 3.12); an import failure is returned through the future like any other error.
+    """
+    try:
+        module.__name__
+    except Exception as e:
+        future = Future()
+        future.set_exception(e)
+        return future
+    return executor.submit(call)
+
+@lru_cache(maxsize=1)
+def _cfg():
+    """AI client configuration, read once per process"""
+    return _lazy("src.utils.ai_client").get_ai_client().get_config()
 
 def test_setup():
     """
     Test the AI Employee Workflow setup without making actual API calls
     """
+    return run_setup_checks()
+
+def run_setup_checks(quick=True):
+    """
+    Run the setup validation phases
+
+    Quick mode only counts knowledge base documents; full mode also aggregates categories.
+    """
+    # Directory creation and the AI client / knowledge base probes are I/O bound,
+    # so they are overlapped on a small pool
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return _validate(executor, quick)
+    finally:
+        _flush()
+
+def _validate(executor, quick):
+    """Run the validation phases, using executor for the I/O-bound steps"""
+    _env_get = os.environ.get
     
-    print("🤖 AI Employee Workflow - Setup Validation")
-    print("=" * 50)
+    _emit("🤖 AI Employee Workflow - Setup Validation")
+    _emit("=" * 50)
     
-    # Load environment variables
-    load_dotenv()
+    # Load environment variables - shells that already export every required variable skip
+    # parsing .env, and override=False leaves any variable already set untouched
+    if not all(_env_get(var) for var in _REQUIRED_VARS):
+        from dotenv import load_dotenv
+        load_dotenv(override=False)
     
-    # Check environment file
-    env_file = Path(".env")
-    if env_file.exists():
-        print("✅ .env file found")
-    else:
-        print("❌ .env file not found. Run: python setup_credentials.py")
+    # Cheap filesystem checks first, so a missing file fails before any heavy import
+    required_paths = (
+        (".env", ".env file", "Run: python setup_credentials.py"),
+        ("example_transcript.txt", "Example transcript", ""),
+    )
+    failed_paths = [(path, label, hint, error) for path, label, hint in required_paths
+                    if (error := _open_error(path)) is not None]
+    if failed_paths:
+        for path, label, hint, error in failed_paths:
+            _emit(f"❌ {label} {error}: {path}" + (f". {hint}" if hint else ""))
         return False
+    for path, label, _ in required_paths:
+        _emit(f"✅ {label} found: {path}")
     
-    # Check required environment variables
-    required_vars = [
-        "OPENAI_API_KEY",
-        "OPENAI_BASE_URL", 
-        "CONFLUENCE_BASE_URL",
-        "CONFLUENCE_API_TOKEN",
-        "CONFLUENCE_USER_EMAIL",
-        "CONFLUENCE_SPACE_KEY",
-        "SLACK_BOT_TOKEN",
-        "SLACK_CHANNEL_ID",
-        "GITHUB_TOKEN",
-        "GITHUB_REPO_URL"
-    ]
-    
-    missing_vars = []
-    for var in required_vars:
-        value = os.getenv(var)
-        if value and not value.startswith("your_"):
-            print(f"✅ {var} configured")
+    _flush()
+    
+    # Test workspace directories
+    _emit("\n📁 Testing workspace setup...")
+    workspace_dir = _env_get("WORKSPACE_DIR", "./workspace")
+    output_dir = _env_get("OUTPUT_DIR", "./outputs")
+    
+    # exist_ok already covers EEXIST; any other OSError is a real problem and propagates
+    for future in [executor.submit(os.makedirs, path, exist_ok=True) for path in (workspace_dir, output_dir)]:
+        future.result()
+    _emit(f"✅ Workspace directories created:")
+    _emit(f"   - Workspace: {workspace_dir}")
+    _emit(f"   - Output: {output_dir}")
+    
+    _flush()
+    
+    # Classify and report each variable in one pass, collecting the summary as we go
+    missing_lines = []
+    for var in _REQUIRED_VARS:
+        value = _env_get(var, "")
+        if not value or value[:_PLACEHOLDER_LEN] == _PLACEHOLDER:
+            _emit(_BAD % var)
+            missing_lines.append(f"   - {var}")
         else:
-            print(f"❌ {var} not configured or using placeholder value")
-            missing_vars.append(var)
+            _emit(_OK % var)
     
-    if missing_vars:
-        print(f"\n⚠️  Please configure these variables in .env file:")
-        for var in missing_vars:
-            print(f"   - {var}")
+    if missing_lines:
+        _emit("\n".join(["\n⚠️  Please configure these variables in .env file:"] + missing_lines))
         return False
     
-    # Test imports
-    print("\n📆 Testing imports...")
+    _flush()
+    
+    # Test imports - modules are only located here (find_spec runs no module body); each one
+    # (and its heavy dependencies) is executed by the phase that first uses it
+    _emit("\n📆 Testing imports...")
     try:
-        from src.utils.ai_client import ai_client
-        print("✅ AI client import successful")
-        
-        from src.knowledge_base.rag_system import rag_system
-        print("✅ RAG system import successful")
-        
-        from src.workflow.orchestrator import WorkflowOrchestrator
-        print("✅ Workflow orchestrator import successful")
-        
+        specs = [(name, label, importlib.util.find_spec(name)) for name, label in _MODULES]
     except ImportError as e:
-        print(f"❌ Import error: {str(e)}")
-        print("   Please install dependencies: pip install -r requirements.txt")
+        _emit(f"❌ Import error: {str(e)}")
+        _emit("   Please install dependencies: pip install -r requirements.txt")
         return False
     
+    for name, label, spec in specs:
+        _emit(f"✅ {label} module found" if spec is not None else f"❌ {label} module not found: {name}")
+    if any(spec is None for _, _, spec in specs):
+        return False
+    
+    ai_client_module, rag_system_module, orchestrator_module = (
+        _lazy(name, spec) for name, _, spec in specs
+    )
+    
+    _flush()
+    
+    # Start both probes before reporting either, so the wait is max(a, b) rather than a + b
+    config_future = _probe(executor, ai_client_module, _cfg)
+    stats_future = _probe(executor, rag_system_module,
+                          lambda: rag_system_module.get_rag_system().get_collection_stats(quick=quick))
+    
     # Test AI client configuration
-    print("\n🤖 Testing AI client configuration...")
+    _emit("\n🤖 Testing AI client configuration...")
     try:
-        config = ai_client.get_config()
-        print(f"✅ AI client configured:")
-        print(f"   - Base URL: {config['base_url']}")
-        print(f"   - Chat Model: {config['chat_model']}")
-        print(f"   - Embedding Model: {config['embedding_model']}")
-        print(f"   - API Key: {'Configured' if config['api_key_configured'] else 'Missing'}")
+        config = config_future.result()
+        _emit("✅ AI client import successful")
+        _emit(f"✅ AI client configured:")
+        _emit(f"   - Base URL: {config['base_url']}")
+        _emit(f"   - Chat Model: {config['chat_model']}")
+        _emit(f"   - Embedding Model: {config['embedding_model']}")
+        _emit(f"   - API Key: {'Configured' if config['api_key_configured'] else 'Missing'}")
+    except ImportError as e:
+        _emit(f"❌ Import error: {str(e)}")
+        _emit("   Please install dependencies: pip install -r requirements.txt")
+        return False
     except Exception as e:
-        print(f"❌ AI client configuration error: {str(e)}")
+        _emit(f"❌ AI client configuration error: {str(e)}")
         return False
     
+    _flush()
+    
     # Test knowledge base
-    print("\n📚 Testing knowledge base...")
+    _emit("\n📚 Testing knowledge base...")
     try:
-        stats = rag_system.get_collection_stats()
+        stats = stats_future.result()
+        _emit("✅ RAG system import successful")
         if 'error' in stats:
-            print(f"❌ Knowledge base error: {stats['error']}")
+            _emit(f"❌ Knowledge base error: {stats['error']}")
             return False
         else:
-            print(f"✅ Knowledge base loaded:")
-            print(f"   - Documents: {stats['total_documents']}")
-            print(f"   - Categories: {list(stats['categories'].keys())}")
-    except Exception as e:
-        print(f"❌ Knowledge base error: {str(e)}")
+            _emit(f"✅ Knowledge base loaded:")
+            _emit(f"   - Documents: {stats['total_documents']}")
+            if 'categories' in stats:
+                _emit(f"   - Categories: {list(stats['categories'].keys())}")
+    except ImportError as e:
+        _emit(f"❌ Import error: {str(e)}")
+        _emit("   Please install dependencies: pip install -r requirements.txt")
         return False
-    
-    # Check example transcript
-    transcript_file = Path("example_transcript.txt")
-    if transcript_file.exists():
-        print(f"✅ Example transcript found: {transcript_file}")
-    else:
-        print(f"❌ Example transcript not found: {transcript_file}")
+    except Exception as e:
+        _emit(f"❌ Knowledge base error: {str(e)}")
         return False
     
-    # Test workspace directories
-    print("\n📁 Testing workspace setup...")
-    workspace_dir = Path(os.getenv("WORKSPACE_DIR", "./workspace"))
-    output_dir = Path(os.getenv("OUTPUT_DIR", "./outputs"))
+    _flush()
     
+    # Test workflow orchestrator import
     try:
-        workspace_dir.mkdir(parents=True, exist_ok=True)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        print(f"✅ Workspace directories created:")
-        print(f"   - Workspace: {workspace_dir}")
-        print(f"   - Output: {output_dir}")
-    except Exception as e:
-        print(f"❌ Workspace setup error: {str(e)}")
+        orchestrator_module.WorkflowOrchestrator
+        _emit("✅ Workflow orchestrator import successful")
+    except ImportError as e:
+        _emit(f"❌ Import error: {str(e)}")
+        _emit("   Please install dependencies: pip install -r requirements.txt")
         return False
     
-    print("\n🎆 Setup validation complete!")
-    print("\n🚀 Ready to run AI Employee Workflow:")
-    print("   python -m src.main example_transcript.txt")
+    _emit("\n🎆 Setup validation complete!")
+    _emit("\n🚀 Ready to run AI Employee Workflow:")
+    _emit("   python -m src.main example_transcript.txt")
     
     return True
 
 if __name__ == "__main__":
-    success = test_setup()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    import argparse
+    
+    # The report is emoji-heavy; make the Windows console take UTF-8 directly
+    if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    
+    parser = argparse.ArgumentParser(description="Validate AI Employee Workflow setup")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--quick", dest="quick", action="store_true",
+                      help="Only count knowledge base documents (default)")
+    mode.add_argument("--full", dest="quick", action="store_false",
+                      help="Also aggregate knowledge base categories (release validation)")
+    parser.set_defaults(quick=True)
+    args = parser.parse_args()
+    
+    success = run_setup_checks(quick=args.quick)
+    # Skip interpreter teardown (atexit handlers of chromadb and friends) - nothing is left
+    # to persist once the report is written
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0 if success else 1)
\ No newline at end of file
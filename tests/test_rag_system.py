@@ -0,0 +1,260 @@
+# Tests for the knowledge base search index
+
+import numpy as np
+import pytest
+
+from src.knowledge_base.rag_system import FlatNumpyIndex
+
+
+def _random_index(rows=500, dims=32, quantize=True, seed=0):
+    """Index of random vectors spread over three categories, plus the raw vectors"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((rows, dims)).astype(np.float32)
+    categories = ["file_operations", "process_management", "threading"]
+    index = FlatNumpyIndex(quantize=quantize)
+    index.add(
+        [f"doc_{i}" for i in range(rows)],
+        [f"document {i}" for i in range(rows)],
+        [{"category": categories[i % 3]} for i in range(rows)],
+        vectors
+    )
+    return index, vectors
+
+
+def _brute_force(vectors, query, top_k, rows=None):
+    """Exact float64 cosine ranking over the given rows (all rows by default)"""
+    rows = np.arange(len(vectors)) if rows is None else np.asarray(rows)
+    matrix = vectors[rows].astype(np.float64)
+    scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    order = np.argsort(-scores)[:top_k]
+    return [int(rows[i]) for i in order], scores[order]
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_search_matches_brute_force(quantize):
+    index, vectors = _random_index(quantize=quantize)
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        query = rng.standard_normal(vectors.shape[1])
+        expected_rows, expected_scores = _brute_force(vectors, query, 5)
+
+        hits = index.search(query, 5)
+
+        assert [row for row, _ in hits] == expected_rows
+        np.testing.assert_allclose([score for _, score in hits], expected_scores, rtol=1e-4, atol=1e-5)
+
+
+def test_search_returns_every_row_when_top_k_exceeds_size():
+    index, vectors = _random_index(rows=4, quantize=False)
+    hits = index.search(vectors[2], 10)
+    assert len(hits) == 4
+    assert hits[0][0] == 2
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_category_filter_only_returns_that_category():
+    index, vectors = _random_index()
+    rows = index.category_rows("threading")
+    assert list(rows) == list(range(2, 500, 3))
+
+    query = np.random.default_rng(2).standard_normal(vectors.shape[1])
+    expected_rows, _ = _brute_force(vectors, query, 5, rows)
+
+    hits = index.search(query, 5, category="threading")
+
+    assert [row for row, _ in hits] == expected_rows
+    assert all(index.metadatas[row]["category"] == "threading" for row, _ in hits)
+
+
+def test_unknown_category_returns_nothing():
+    index, vectors = _random_index()
+    assert index.category_rows("networking") is None
+    assert index.search(vectors[0], 5, category="networking") == []
+
+
+def test_empty_index_returns_nothing():
+    assert FlatNumpyIndex().search(np.ones(8), 5) == []
+
+
+def test_save_load_round_trip(tmp_path):
+    index, vectors = _random_index()
+    prefix = str(tmp_path / "kb")
+    index.save(prefix, {"embedding_model": "test-model"})
+
+    loaded, info = FlatNumpyIndex.load(prefix)
+
+    assert info == {"embedding_model": "test-model"}
+    assert loaded.ids == index.ids
+    assert loaded.documents == index.documents
+    assert loaded.metadatas == index.metadatas
+    np.testing.assert_array_equal(loaded.M, index.M)
+    np.testing.assert_array_equal(loaded.M_q, index.M_q)
+    np.testing.assert_array_equal(loaded.category_rows("threading"), index.category_rows("threading"))
+
+    query = np.random.default_rng(3).standard_normal(vectors.shape[1])
+    assert loaded.search(query, 5) == index.search(query, 5)
+    assert loaded.search(query, 5, category="file_operations") == index.search(query, 5, category="file_operations")
+
+
+def test_load_rejects_inconsistent_files(tmp_path):
+    index, _ = _random_index(rows=10)
+    prefix = str(tmp_path / "kb")
+    index.save(prefix)
+    _random_index(rows=12)[0].save(str(tmp_path / "other"))
+    (tmp_path / "other.vectors.npy").replace(tmp_path / "kb.vectors.npy")
+
+    with pytest.raises(ValueError):
+        FlatNumpyIndex.load(prefix)
+
+
+def test_load_missing_files_raises_oserror(tmp_path):
+    with pytest.raises(OSError):
+        FlatNumpyIndex.load(str(tmp_path / "missing"))
+
+
+# Hybrid ranking and query cache, on a small in-memory knowledge base
+
+from src.knowledge_base import rag_system
+from src.knowledge_base.rag_system import LinuxWindowsRAGSystem, _tokenize
+from rank_bm25 import BM25Okapi
+
+_DOCUMENTS = [
+    "fork creates a child process",
+    "CreateProcess starts a new process on windows",
+    "pthread_create starts a thread",
+    "open reads a file from disk",
+]
+_VECTORS = np.array([
+    [1.0, 0.1, 0.0, 0.0],
+    [0.8, 0.6, 0.0, 0.0],
+    [0.0, 0.2, 1.0, 0.0],
+    [0.0, 0.0, 0.1, 1.0],
+], dtype=np.float32)
+
+
+class _FakeEmbedder:
+    """Embeds every text to a fixed vector and counts the requests"""
+
+    def __init__(self, vector):
+        self.vector = vector
+        self.query_calls = 0
+        self.document_calls = 0
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return self.vector
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return [self.vector for _ in texts]
+
+
+def _make_system(query_vector=(0.7, 0.7, 0.1, 0.0), cache_max_size=2000, cache_ttl=300.0):
+    """A LinuxWindowsRAGSystem over _DOCUMENTS, without ChromaDB or an embeddings endpoint"""
+    system = LinuxWindowsRAGSystem.__new__(LinuxWindowsRAGSystem)
+    system.bm25_threshold = 2.0
+    system._cache = rag_system.collections.OrderedDict()
+    system._cache_lock = rag_system.threading.RLock()
+    system._cache_max_size = cache_max_size
+    system._cache_ttl = cache_ttl
+    system._cache_hits = 0
+    system._cache_misses = 0
+    system.embedder = _FakeEmbedder(np.asarray(query_vector, dtype=np.float32))
+
+    index = FlatNumpyIndex(quantize=False)
+    index.add(
+        [f"doc_{i}" for i in range(len(_DOCUMENTS))],
+        list(_DOCUMENTS),
+        [{"category": "process_management" if i < 2 else "other", "linux_api": f"api_{i}"} for i in range(len(_DOCUMENTS))],
+        _VECTORS
+    )
+    system._set_index(index)
+    return system
+
+
+def test_blend_orders_by_weighted_bm25_and_cosine():
+    system = _make_system()
+    query = "start a new process"
+
+    results = system.query_knowledge(query, top_k=4)
+
+    bm25 = BM25Okapi([_tokenize(document) for document in _DOCUMENTS]).get_scores(_tokenize(query))
+    bm25_norm = bm25 / bm25.max()
+    vectors = _VECTORS / np.linalg.norm(_VECTORS, axis=1, keepdims=True)
+    cosine = vectors @ (system.embedder.vector / np.linalg.norm(system.embedder.vector))
+    expected = 0.4 * bm25_norm + 0.6 * (cosine + 1.0) / 2.0
+    expected_order = [f"doc_{i}" for i in np.argsort(-expected, kind="stable")]
+
+    assert system.embedder.query_calls == 1
+    assert [result["id"] for result in results] == expected_order
+    np.testing.assert_allclose([result["similarity_score"] for result in results], np.sort(expected)[::-1], rtol=1e-5)
+
+
+def test_confident_lexical_match_skips_embedding():
+    system = _make_system()
+    # Four documents keep IDF small, so lower the threshold to the corpus scale
+    system.bm25_threshold = 0.5
+
+    results = system.query_knowledge("fork", top_k=2)
+
+    assert system.embedder.query_calls == 0
+    assert results[0]["id"] == "doc_0"
+    assert results[0]["similarity_score"] == pytest.approx(1.0)
+
+
+def test_batch_suggestions_match_single_queries():
+    system = _make_system()
+    snippets = ["fork()", "start a new process", "read a file"]
+
+    single = [system.get_conversion_suggestions(snippet) for snippet in snippets]
+    system._invalidate_cache()
+    batch = system.get_conversion_suggestions_batch(snippets)
+
+    assert batch == single
+    assert system.embedder.document_calls <= 1
+
+
+def test_cache_hit_and_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rag_system.time, "monotonic", lambda: now[0])
+    system = _make_system(cache_ttl=10.0)
+
+    first = system.query_knowledge("start a new process")
+    assert system.query_knowledge("start a new process") == first
+    assert system.get_cache_stats()["hits"] == 1
+    assert system.embedder.query_calls == 1
+
+    now[0] += 11.0
+    assert system.query_knowledge("start a new process") == first
+    assert system.get_cache_stats()["hits"] == 1
+    assert system.embedder.query_calls == 2
+
+
+def test_cache_evicts_least_recently_used():
+    system = _make_system(cache_max_size=2)
+
+    system.query_knowledge("start a new process")
+    system.query_knowledge("spawn a worker thread")
+    system.query_knowledge("start a new process")  # refreshes the first entry
+    system.query_knowledge("read data from disk")  # evicts the second
+
+    assert list(system._cache) == [
+        ("start a new process", 5, None),
+        ("read data from disk", 5, None),
+    ]
+    hits = system.get_cache_stats()["hits"]
+    system.query_knowledge("spawn a worker thread")
+    assert system.get_cache_stats()["hits"] == hits
+
+
+def test_mutating_results_does_not_corrupt_cache_or_index():
+    system = _make_system()
+
+    results = system.query_knowledge("start a new process")
+    results[0]["metadata"]["category"] = "changed"
+    results.clear()
+
+    cached = system.query_knowledge("start a new process")
+    assert system.get_cache_stats()["hits"] == 1
+    assert cached and all(result["metadata"]["category"] != "changed" for result in cached)
+    assert "changed" not in {metadata["category"] for metadata in system.index.metadatas}